@@ -9,13 +9,58 @@ Parses the full session to understand:
 4. Response patterns (type 0x12 vs 0x21 commands)
 """
 
+import argparse
+import mmap
+import re
 import struct
 import sys
 from collections import defaultdict
+from typing import NamedTuple
+
+
+# Dashboard-related services, keyed as (svc_hi << 8) | svc_lo
+DASHBOARD_SERVICES = frozenset({0x0120, 0x0420, 0x0720, 0x0A20, 0x0E20, 0x1020})
+# Services already understood; anything else is listed as unexplored
+KNOWN_SERVICES = DASHBOARD_SERVICES | {0x8000, 0x8020, 0x0B20, 0x0620, 0x0220}
+# Indent per nesting depth in the deep-dive listing
+DEEP_DIVE_INDENT = ("      ", "        ", "          ")
+
+
+class Packet(NamedTuple):
+    """One G2 frame found in the capture."""
+    index: int
+    file_offset: int
+    type: int  # 0x21 = command, 0x12 = response?
+    seq: int
+    pkt_len: int
+    pkt_tot: int
+    pkt_ser: int
+    svc_hi: int
+    svc_lo: int
+    svc_key: int  # (svc_hi << 8) | svc_lo
+    protobuf: bytes
+
+    @property
+    def service(self):
+        return service_name(self.svc_key)
+
+
+def service_name(svc_key):
+    """Format a packed service key as 0xHI-LO."""
+    return f"0x{svc_key >> 8:02X}-{svc_key & 0xFF:02X}"
 
 
 def decode_varint(data, offset=0):
     """Decode a protobuf varint, return (value, bytes_consumed)."""
+    # Fast paths: tags and short lengths are almost always 1-2 bytes
+    if offset < len(data):
+        b = data[offset]
+        if b < 0x80:
+            return b, 1
+        if offset + 1 < len(data):
+            b2 = data[offset + 1]
+            if b2 < 0x80:
+                return (b & 0x7F) | (b2 << 7), 2
     result = 0
     shift = 0
     consumed = 0
@@ -30,41 +75,63 @@ def decode_varint(data, offset=0):
     return result, consumed
 
 
-def decode_protobuf_fields(data):
-    """Simple protobuf decoder - returns list of (field_num, wire_type, value)."""
+_FIXED32 = struct.Struct('<f')
+_FIXED64 = struct.Struct('<d')
+
+
+def decode_protobuf_fields(data, limit=None):
+    """Simple protobuf decoder - returns list of (field_num, wire_type, value).
+
+    Stops after `limit` fields when given, leaving the rest undecoded.
+    """
+    # Single-byte tags, varints and lengths are decoded inline; only longer
+    # varints pay for the decode_varint() call.
     fields = []
+    size = len(data)
     i = 0
-    while i < len(data):
-        if i >= len(data):
+    while i < size:
+        if limit is not None and len(fields) >= limit:
             break
-        tag, consumed = decode_varint(data, i)
-        i += consumed
+        tag = data[i]
+        if tag < 0x80:
+            i += 1
+        else:
+            tag, consumed = decode_varint(data, i)
+            i += consumed
         field_num = tag >> 3
         wire_type = tag & 0x07
 
         if wire_type == 0:  # varint
-            val, consumed = decode_varint(data, i)
-            i += consumed
+            if i < size and data[i] < 0x80:
+                val = data[i]
+                i += 1
+            else:
+                val, consumed = decode_varint(data, i)
+                i += consumed
             fields.append((field_num, 'varint', val))
         elif wire_type == 2:  # length-delimited
-            length, consumed = decode_varint(data, i)
-            i += consumed
-            if i + length <= len(data):
+            if i < size and data[i] < 0x80:
+                length = data[i]
+                i += 1
+            else:
+                length, consumed = decode_varint(data, i)
+                i += consumed
+            if i + length <= size:
                 val = data[i:i+length]
                 fields.append((field_num, 'bytes', val))
                 i += length
             else:
                 break
         elif wire_type == 5:  # 32-bit fixed
-            if i + 4 <= len(data):
-                val = struct.unpack('<f', data[i:i+4])[0]
+            if i + 4 <= size:
+                val = _FIXED32.unpack_from(data, i)[0]
                 fields.append((field_num, 'fixed32', val))
                 i += 4
             else:
                 break
         elif wire_type == 1:  # 64-bit fixed
-            if i + 8 <= len(data):
-                val = struct.unpack('<d', data[i:i+8])[0]
+            if i + 8 <= size:
+                val = _FIXED64.unpack_from(data, i)[0]
                 fields.append((field_num, 'fixed64', val))
                 i += 8
             else:
@@ -74,28 +141,92 @@ def decode_protobuf_fields(data):
     return fields
 
 
+def walk_protobuf(data, max_depth, depth=0, leaf_limit=None):
+    """Walk nested protobuf fields depth-first.
+
+    Yields (depth, field_num, wire_type, value); length-delimited fields are
+    descended into until max_depth. Messages at max_depth are only decoded
+    up to leaf_limit fields.
+    """
+    limit = leaf_limit if depth == max_depth else None
+    for field_num, wire_type, val in decode_protobuf_fields(data, limit):
+        yield depth, field_num, wire_type, val
+        if wire_type == 'bytes' and depth < max_depth:
+            yield from walk_protobuf(val, max_depth, depth + 1, leaf_limit)
+
+
+def iter_offsets(data, marker):
+    """Yield every offset of marker in data, scanning lazily."""
+    i = data.find(marker)
+    while i >= 0:
+        yield i
+        i = data.find(marker, i + 1)
+
+
+_STRING_RES = {}
+
+
 def extract_strings(data, min_len=4):
     """Extract ASCII strings from binary data."""
-    strings = []
-    i = 0
-    while i < len(data):
-        if 0x20 <= data[i] <= 0x7E:
-            start = i
-            while i < len(data) and 0x20 <= data[i] <= 0x7E:
-                i += 1
-            if i - start >= min_len:
-                strings.append(data[start:i].decode('ascii'))
-        else:
-            i += 1
-    return strings
+    pattern = _STRING_RES.get(min_len)
+    if pattern is None:
+        pattern = _STRING_RES[min_len] = re.compile(rb"[\x20-\x7e]{%d,}" % max(min_len, 1))
+    return [m.decode('ascii') for m in pattern.findall(data)]
 
 
-def main():
-    capture_file = sys.argv[1] if len(sys.argv) > 1 else \
-        "/Users/ken/Projects/Personal/even-g2-protocol/captures/scripted-session.log"
+def print_full_sequence(all_packets):
+    """Print one line per packet, buffered into a single write."""
+    out = [f"\n{'=' * 80}\n", "FULL PACKET SEQUENCE\n", "=" * 80 + "\n"]
+    for i, p in enumerate(all_packets):
+        proto = p.protobuf
+        svc = p.service
+        type_label = "CMD" if p.type == 0x21 else f"t=0x{p.type:02X}"
 
-    with open(capture_file, "rb") as f:
-        data = f.read()
+        # Decode first few protobuf fields
+        fields = decode_protobuf_fields(proto, limit=5)
+        field_str = ""
+        for fn, wt, val in fields:
+            if wt == 'varint':
+                field_str += f" f{fn}={val}"
+            elif wt == 'bytes':
+                if len(val) <= 20:
+                    field_str += f" f{fn}=[{len(val)}b]"
+                else:
+                    field_str += f" f{fn}=[{len(val)}b]"
+            elif wt == 'fixed32':
+                field_str += f" f{fn}={val:.1f}"
+
+        # Extract strings
+        strings = extract_strings(proto)
+        str_str = ""
+        if strings:
+            str_str = f"  \"{strings[0][:40]}\""
+
+        multi = ""
+        if p.pkt_tot > 1:
+            multi = f" [{p.pkt_ser}/{p.pkt_tot}]"
+
+        out.append(f"  [{i:3d}] seq=0x{p.seq:02X} {type_label:6s} {svc}"
+                   f" ({len(proto):3d}b){multi}{field_str}{str_str}\n")
+    sys.stdout.writelines(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a Samsung BTSnoop G2 capture")
+    parser.add_argument("capture_file", nargs="?",
+                        default="/Users/ken/Projects/Personal/even-g2-protocol/captures/scripted-session.log",
+                        help="Path to the BTSnoop capture")
+    parser.add_argument("--full-sequence", action="store_true",
+                        help="Print every packet in the capture (slow on large captures)")
+    args = parser.parse_args()
+
+    # Map the capture rather than reading it; only the small protobuf slices
+    # taken per packet are ever copied out.
+    with open(args.capture_file, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            data = b""
 
     if data[:8] != b"btsnoop\x00":
         print(f"ERROR: Not a BTSnoop file")
@@ -107,52 +238,36 @@ def main():
 
     # Find ALL ATT Write Commands to handle 0x0842
     # Marker: 0x52 (ATT Write Cmd) + 0x42 0x08 (handle LE) + type byte
+    # and parse each one as it is found.
+    # Headers are unpacked in place: slicing data[gatt_start:] per packet
+    # would copy the rest of the capture every time.
     marker_cmd = bytes([0x52, 0x42, 0x08])
-    positions = []
-    for i in range(len(data) - 4):
-        if data[i:i+3] == marker_cmd:
-            positions.append(i)
-
-    print(f"Total GATT Write Command packets to handle 0x0842: {len(positions)}\n")
-
-    # Parse all packets
+    header = struct.Struct("7B")
+    marker_count = 0
     all_packets = []
-    for pos in positions:
+    for pos in iter_offsets(data, marker_cmd):
+        marker_count += 1
         gatt_start = pos + 3  # skip ATT opcode(1) + handle(2)
-        frame = data[gatt_start:]
-        if len(frame) < 7:
+        if len(data) - gatt_start < 7:
             continue
 
-        pkt_type = frame[0]  # 0x21 = command, 0x12 = response?
-        seq = frame[1]
-        pkt_len = frame[2]
-        pkt_tot = frame[3]
-        pkt_ser = frame[4]
-        svc_hi = frame[5]
-        svc_lo = frame[6]
+        (pkt_type, seq, pkt_len, pkt_tot, pkt_ser,
+         svc_hi, svc_lo) = header.unpack_from(data, gatt_start)
 
         if pkt_len < 2:
             continue
 
         protobuf_len = pkt_len - 2
-        if len(frame) < 7 + pkt_len:
+        if len(data) - gatt_start < 7 + pkt_len:
             continue
 
-        protobuf = frame[7:7+protobuf_len]
-
-        all_packets.append({
-            "index": len(all_packets),
-            "file_offset": pos,
-            "type": pkt_type,
-            "seq": seq,
-            "pkt_len": pkt_len,
-            "pkt_tot": pkt_tot,
-            "pkt_ser": pkt_ser,
-            "svc_hi": svc_hi,
-            "svc_lo": svc_lo,
-            "service": f"0x{svc_hi:02X}-{svc_lo:02X}",
-            "protobuf": protobuf,
-        })
+        protobuf = data[gatt_start + 7:gatt_start + 7 + protobuf_len]
+
+        all_packets.append(Packet(len(all_packets), pos, pkt_type, seq, pkt_len,
+                                  pkt_tot, pkt_ser, svc_hi, svc_lo,
+                                  (svc_hi << 8) | svc_lo, protobuf))
+
+    print(f"Total GATT Write Command packets to handle 0x0842: {marker_count}\n")
 
     # =========================================================================
     # Summary by service
@@ -161,109 +276,70 @@ def main():
     print("SERVICE DISTRIBUTION")
     print("=" * 80)
 
-    svc_counts = defaultdict(int)
-    svc_types = defaultdict(set)
+    # One grouping pass; the per-service sections below reuse it
+    by_service = defaultdict(list)
     for p in all_packets:
-        svc_counts[p["service"]] += 1
-        svc_types[p["service"]].add(p["type"])
+        by_service[p.svc_key].append(p)
 
-    for svc in sorted(svc_counts.keys()):
-        types = sorted(svc_types[svc])
+    for key in sorted(by_service):
+        pkts = by_service[key]
+        types = sorted({p.type for p in pkts})
         type_str = ", ".join(f"0x{t:02X}" for t in types)
-        print(f"  {svc}: {svc_counts[svc]:4d} packets  (types: {type_str})")
+        print(f"  {service_name(key)}: {len(pkts):4d} packets  (types: {type_str})")
 
     # =========================================================================
     # Full packet-by-packet sequence
     # =========================================================================
-    print(f"\n{'=' * 80}")
-    print("FULL PACKET SEQUENCE")
-    print("=" * 80)
-
-    for i, p in enumerate(all_packets):
-        proto = p["protobuf"]
-        svc = p["service"]
-        type_label = "CMD" if p["type"] == 0x21 else f"t=0x{p['type']:02X}"
-
-        # Decode first few protobuf fields
-        fields = decode_protobuf_fields(proto)
-        field_str = ""
-        for fn, wt, val in fields[:5]:
-            if wt == 'varint':
-                field_str += f" f{fn}={val}"
-            elif wt == 'bytes':
-                if len(val) <= 20:
-                    field_str += f" f{fn}=[{len(val)}b]"
-                else:
-                    field_str += f" f{fn}=[{len(val)}b]"
-            elif wt == 'fixed32':
-                field_str += f" f{fn}={val:.1f}"
-
-        # Extract strings
-        strings = extract_strings(proto)
-        str_str = ""
-        if strings:
-            str_str = f"  \"{strings[0][:40]}\""
-
-        multi = ""
-        if p["pkt_tot"] > 1:
-            multi = f" [{p['pkt_ser']}/{p['pkt_tot']}]"
-
-        print(f"  [{i:3d}] seq=0x{p['seq']:02X} {type_label:6s} {svc}"
-              f" ({len(proto):3d}b){multi}{field_str}{str_str}")
+    if args.full_sequence:
+        print_full_sequence(all_packets)
 
     # =========================================================================
     # Dashboard-related sequence (services: 0x01, 0x04, 0x07, 0x0A, 0x0E, 0x10)
     # =========================================================================
-    dashboard_services = {"0x01-20", "0x04-20", "0x07-20", "0x0A-20", "0x0E-20", "0x10-20"}
     print(f"\n{'=' * 80}")
     print("DASHBOARD-RELATED PACKETS")
     print("=" * 80)
 
     for i, p in enumerate(all_packets):
-        if p["service"] in dashboard_services:
-            proto = p["protobuf"]
-            fields = decode_protobuf_fields(proto)
+        if p.svc_key in DASHBOARD_SERVICES:
+            proto = p.protobuf
+            fields = decode_protobuf_fields(proto, limit=8)
             strings = extract_strings(proto)
 
             field_str = ""
-            for fn, wt, val in fields[:8]:
+            for fn, wt, val in fields:
                 if wt == 'varint':
                     field_str += f" f{fn}={val}"
                 elif wt == 'bytes':
-                    sub = decode_protobuf_fields(val)
-                    sub_str = " ".join(f"f{sf}={sv}" for sf, st, sv in sub[:3] if st == 'varint')
+                    sub = decode_protobuf_fields(val, limit=3)
+                    sub_str = " ".join(f"f{sf}={sv}" for sf, st, sv in sub if st == 'varint')
                     field_str += f" f{fn}=[{len(val)}b: {sub_str}]"
 
             str_info = ""
             if strings:
                 str_info = f"\n         strings: {strings}"
 
-            print(f"  [{i:3d}] seq=0x{p['seq']:02X} {p['service']}"
+            print(f"  [{i:3d}] seq=0x{p.seq:02X} {p.service}"
                   f" ({len(proto):3d}b){field_str}{str_info}")
 
     # =========================================================================
     # Unknown/interesting services deep dive
     # =========================================================================
-    unknown_services = set()
-    for p in all_packets:
-        if p["service"] not in {"0x80-00", "0x80-20", "0x0B-20", "0x06-20",
-                                 "0x01-20", "0x04-20", "0x07-20", "0x0A-20",
-                                 "0x0E-20", "0x10-20", "0x02-20"}:
-            unknown_services.add(p["service"])
+    unknown_services = sorted(key for key in by_service if key not in KNOWN_SERVICES)
 
     if unknown_services:
         print(f"\n{'=' * 80}")
-        print(f"UNKNOWN/UNEXPLORED SERVICES: {sorted(unknown_services)}")
+        print(f"UNKNOWN/UNEXPLORED SERVICES: {[service_name(key) for key in unknown_services]}")
         print("=" * 80)
 
-        for svc in sorted(unknown_services):
-            pkts = [p for p in all_packets if p["service"] == svc]
-            print(f"\n  --- {svc}: {len(pkts)} packets ---")
+        for key in unknown_services:
+            pkts = by_service[key]
+            print(f"\n  --- {service_name(key)}: {len(pkts)} packets ---")
             for p in pkts[:10]:
-                proto = p["protobuf"]
-                fields = decode_protobuf_fields(proto)
+                proto = p.protobuf
+                fields = decode_protobuf_fields(proto, limit=8)
                 field_str = ""
-                for fn, wt, val in fields[:8]:
+                for fn, wt, val in fields:
                     if wt == 'varint':
                         field_str += f" f{fn}={val}"
                     elif wt == 'bytes':
@@ -272,20 +348,23 @@ def main():
                 str_info = ""
                 if strings:
                     str_info = f" \"{strings[0][:40]}\""
-                print(f"    [{p['index']:3d}] seq=0x{p['seq']:02X} ({len(proto):3d}b)"
+                print(f"    [{p.index:3d}] seq=0x{p.seq:02X} ({len(proto):3d}b)"
                       f"{field_str}{str_info}")
                 print(f"          hex: {proto.hex()[:80]}")
 
     # =========================================================================
     # Look for service-related configuration patterns
     # =========================================================================
+    svc01_pkts = by_service.get(0x0120)
+    if not svc01_pkts:
+        return
+
     print(f"\n{'=' * 80}")
     print("SERVICE 0x01-20 DEEP DIVE (Widget/Service Config)")
     print("=" * 80)
 
-    svc01_pkts = [p for p in all_packets if p["service"] == "0x01-20"]
     for p in svc01_pkts:
-        proto = p["protobuf"]
+        proto = p.protobuf
         fields = decode_protobuf_fields(proto)
         strings = extract_strings(proto, min_len=3)
 
@@ -298,38 +377,34 @@ def main():
             if fn == 2 and wt == 'varint':
                 msg_id = val
 
-        print(f"\n  [{p['index']:3d}] seq=0x{p['seq']:02X} type={type_val} msg_id={msg_id}"
+        print(f"\n  [{p.index:3d}] seq=0x{p.seq:02X} type={type_val} msg_id={msg_id}"
               f" ({len(proto)}b)")
 
         # Deep decode field 4 (the main content)
         for fn, wt, val in fields:
             if fn == 4 and wt == 'bytes':
-                sub = decode_protobuf_fields(val)
                 print(f"    field 4 ({len(val)}b):")
-                for sfn, swt, sval in sub:
-                    if swt == 'varint':
-                        print(f"      f{sfn} = {sval}")
+                for depth, sfn, swt, sval in walk_protobuf(val, max_depth=2, leaf_limit=6):
+                    indent = DEEP_DIVE_INDENT[depth]
+                    if depth == 2:
+                        if swt == 'varint':
+                            print(f"{indent}f{sfn}={sval}")
+                        elif swt == 'bytes':
+                            s_str = extract_strings(sval, 3)
+                            if s_str:
+                                print(f"{indent}f{sfn}=\"{s_str[0]}\"")
+                            else:
+                                print(f"{indent}f{sfn}=[{len(sval)}b]:{sval.hex()[:30]}")
+                    elif swt == 'varint':
+                        print(f"{indent}f{sfn} = {sval}")
                     elif swt == 'bytes':
-                        sub2 = decode_protobuf_fields(sval)
-                        print(f"      f{sfn} [{len(sval)}b]:")
-                        for s2fn, s2wt, s2val in sub2:
-                            if s2wt == 'varint':
-                                print(f"        f{s2fn} = {s2val}")
-                            elif s2wt == 'bytes':
-                                sub3 = decode_protobuf_fields(s2val)
-                                s3_strings = extract_strings(s2val, 3)
-                                print(f"        f{s2fn} [{len(s2val)}b]: {s2val.hex()[:40]}")
-                                if s3_strings:
-                                    print(f"          strings: {s3_strings}")
-                                for s3fn, s3wt, s3val in sub3[:6]:
-                                    if s3wt == 'varint':
-                                        print(f"          f{s3fn}={s3val}")
-                                    elif s3wt == 'bytes':
-                                        s3_str = extract_strings(s3val, 3)
-                                        if s3_str:
-                                            print(f"          f{s3fn}=\"{s3_str[0]}\"")
-                                        else:
-                                            print(f"          f{s3fn}=[{len(s3val)}b]:{s3val.hex()[:30]}")
+                        if depth == 0:
+                            print(f"{indent}f{sfn} [{len(sval)}b]:")
+                        else:
+                            print(f"{indent}f{sfn} [{len(sval)}b]: {sval.hex()[:40]}")
+                            s_strings = extract_strings(sval, 3)
+                            if s_strings:
+                                print(f"{DEEP_DIVE_INDENT[2]}strings: {s_strings}")
 
         if strings:
             print(f"    strings: {strings}")
@@ -19,15 +19,41 @@ import argparse
 import asyncio
 import json
 import logging
+import struct
 import time
 from typing import Optional
 
 import websockets
 from bleak import BleakClient, BleakScanner
 
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
+try:
+    # websockets >= 13: recv(decode=False) hands text frames over as raw
+    # bytes, skipping the UTF-8 decode the JSON parser would repeat anyway
+    from websockets.asyncio.server import serve as ws_serve
+    _RECV_RAW = True
+except ImportError:
+    ws_serve = websockets.serve
+    _RECV_RAW = False
+
 log = logging.getLogger("g2-bridge")
 
 
+if orjson is not None:
+    def _dumps(obj) -> str:
+        # Text frames: the SDK reads message data as a string
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+else:
+    _dumps = json.dumps
+    _loads = json.loads
+
+
 # =============================================================================
 # BLE Constants
 # =============================================================================
@@ -41,13 +67,22 @@ CHAR_NOTIFY = UUID_BASE.format(0x5402)
 # Packet Building (from notify.py)
 # =============================================================================
 
+def _crc16_table_entry(byte):
+    crc = byte << 8
+    for _ in range(8):
+        crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        crc &= 0xFFFF
+    return crc
+
+
+_CRC16_TABLE = tuple(_crc16_table_entry(i) for i in range(256))
+
+
 def crc16_ccitt(data, init=0xFFFF):
     crc = init
+    table = _CRC16_TABLE
     for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
-            crc &= 0xFFFF
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
     return crc
 
 
@@ -56,7 +91,15 @@ def add_crc(packet):
     return packet + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
 
 
+_VARINT_1BYTE = tuple(bytes([i]) for i in range(0x80))
+
+
 def encode_varint(value):
+    # msg_ids, lengths and most field values fit in one or two bytes
+    if value < 0x80:
+        return _VARINT_1BYTE[value]
+    if value < 0x4000:
+        return bytes([(value & 0x7F) | 0x80, value >> 7])
     result = []
     while value > 0x7F:
         result.append((value & 0x7F) | 0x80)
@@ -65,17 +108,33 @@ def encode_varint(value):
     return bytes(result)
 
 
+_AA_HEADER = struct.Struct("8B")
+
+
 def build_aa_packet(seq, svc_hi, svc_lo, payload):
-    header = bytes([0xAA, 0x21, seq, len(payload) + 2, 0x01, 0x01, svc_hi, svc_lo])
-    return add_crc(header + payload)
+    # Header, payload and CRC are written into one buffer; the CRC covers
+    # exactly the payload, so it is computed on that directly.
+    size = len(payload)
+    packet = bytearray(size + 10)
+    _AA_HEADER.pack_into(packet, 0, 0xAA, 0x21, seq, size + 2, 0x01, 0x01, svc_hi, svc_lo)
+    packet[8:8 + size] = payload
+    crc = crc16_ccitt(payload)
+    packet[-2] = crc & 0xFF
+    packet[-1] = crc >> 8
+    return bytes(packet)
+
+
+# Single-byte tags for every field number a one-byte tag can hold
+_PB_TAG_VARINT = tuple(bytes([(field << 3) | 0]) for field in range(32))
+_PB_TAG_BYTES = tuple(bytes([(field << 3) | 2]) for field in range(32))
 
 
 def pb_varint(field, value):
-    return bytes([(field << 3) | 0]) + encode_varint(value)
+    return _PB_TAG_VARINT[field] + encode_varint(value)
 
 
 def pb_bytes(field, data):
-    return bytes([(field << 3) | 2]) + encode_varint(len(data)) + data
+    return _PB_TAG_BYTES[field] + encode_varint(len(data)) + data
 
 
 def pb_string(field, text):
@@ -86,23 +145,29 @@ def pb_string(field, text):
 # Auth
 # =============================================================================
 
+# The five timestamp-free auth packets never change, so they are built
+# (and CRC'd) once at import.
+_AUTH_1 = add_crc(bytes([0xAA, 0x21, 0x01, 0x0C, 0x01, 0x01, 0x80, 0x00,
+    0x08, 0x04, 0x10, 0x0C, 0x1A, 0x04, 0x08, 0x01, 0x10, 0x04]))
+_AUTH_2 = add_crc(bytes([0xAA, 0x21, 0x02, 0x0A, 0x01, 0x01, 0x80, 0x20,
+    0x08, 0x05, 0x10, 0x0E, 0x22, 0x02, 0x08, 0x02]))
+_AUTH_4 = add_crc(bytes([0xAA, 0x21, 0x04, 0x0C, 0x01, 0x01, 0x80, 0x00,
+    0x08, 0x04, 0x10, 0x10, 0x1A, 0x04, 0x08, 0x01, 0x10, 0x04]))
+_AUTH_5 = add_crc(bytes([0xAA, 0x21, 0x05, 0x0C, 0x01, 0x01, 0x80, 0x00,
+    0x08, 0x04, 0x10, 0x11, 0x1A, 0x04, 0x08, 0x01, 0x10, 0x04]))
+_AUTH_6 = add_crc(bytes([0xAA, 0x21, 0x06, 0x0A, 0x01, 0x01, 0x80, 0x20,
+    0x08, 0x05, 0x10, 0x12, 0x22, 0x02, 0x08, 0x01]))
+_AUTH_TXID = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
+
+
 def build_auth_packets():
     timestamp = int(time.time())
     ts_varint = encode_varint(timestamp)
-    txid = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
-    packets = []
-    packets.append(add_crc(bytes([0xAA, 0x21, 0x01, 0x0C, 0x01, 0x01, 0x80, 0x00,
-        0x08, 0x04, 0x10, 0x0C, 0x1A, 0x04, 0x08, 0x01, 0x10, 0x04])))
-    packets.append(add_crc(bytes([0xAA, 0x21, 0x02, 0x0A, 0x01, 0x01, 0x80, 0x20,
-        0x08, 0x05, 0x10, 0x0E, 0x22, 0x02, 0x08, 0x02])))
+    txid = _AUTH_TXID
+    packets = [_AUTH_1, _AUTH_2]
     payload = bytes([0x08, 0x80, 0x01, 0x10, 0x0F, 0x82, 0x08, 0x11, 0x08]) + ts_varint + bytes([0x10]) + txid
     packets.append(add_crc(bytes([0xAA, 0x21, 0x03, len(payload) + 2, 0x01, 0x01, 0x80, 0x20]) + payload))
-    packets.append(add_crc(bytes([0xAA, 0x21, 0x04, 0x0C, 0x01, 0x01, 0x80, 0x00,
-        0x08, 0x04, 0x10, 0x10, 0x1A, 0x04, 0x08, 0x01, 0x10, 0x04])))
-    packets.append(add_crc(bytes([0xAA, 0x21, 0x05, 0x0C, 0x01, 0x01, 0x80, 0x00,
-        0x08, 0x04, 0x10, 0x11, 0x1A, 0x04, 0x08, 0x01, 0x10, 0x04])))
-    packets.append(add_crc(bytes([0xAA, 0x21, 0x06, 0x0A, 0x01, 0x01, 0x80, 0x20,
-        0x08, 0x05, 0x10, 0x12, 0x22, 0x02, 0x08, 0x01])))
+    packets.extend((_AUTH_4, _AUTH_5, _AUTH_6))
     payload = bytes([0x08, 0x80, 0x01, 0x10, 0x13, 0x82, 0x08, 0x11, 0x08]) + ts_varint + bytes([0x10]) + txid
     packets.append(add_crc(bytes([0xAA, 0x21, 0x07, len(payload) + 2, 0x01, 0x01, 0x80, 0x20]) + payload))
     return packets
@@ -112,16 +177,21 @@ def build_auth_packets():
 # Conversate Service (0x0B-20)
 # =============================================================================
 
+_CONVERSATE_CMD_CONFIG = pb_varint(1, 1)
+_CONVERSATE_CMD_TRANSCRIPTION = pb_varint(1, 5)
+_CONVERSATE_SESSION = pb_bytes(3, pb_varint(1, 1) + pb_bytes(
+    2, pb_varint(1, 1) + pb_varint(2, 1) + pb_varint(3, 1) + pb_varint(4, 1)))
+_TRANSCRIPT_FINAL = (pb_varint(2, 0), pb_varint(2, 1))
+
+
 def build_conversate_config(seq, msg_id):
-    inner_settings = pb_varint(1, 1) + pb_varint(2, 1) + pb_varint(3, 1) + pb_varint(4, 1)
-    session = pb_varint(1, 1) + pb_bytes(2, inner_settings)
-    payload = pb_varint(1, 1) + pb_varint(2, msg_id) + pb_bytes(3, session)
+    payload = _CONVERSATE_CMD_CONFIG + pb_varint(2, msg_id) + _CONVERSATE_SESSION
     return build_aa_packet(seq, 0x0B, 0x20, payload)
 
 
 def build_transcription(seq, msg_id, text, is_final=False):
-    transcript = pb_string(1, text) + pb_varint(2, 1 if is_final else 0)
-    payload = pb_varint(1, 5) + pb_varint(2, msg_id) + pb_bytes(7, transcript)
+    transcript = pb_string(1, text) + _TRANSCRIPT_FINAL[bool(is_final)]
+    payload = _CONVERSATE_CMD_TRANSCRIPTION + pb_varint(2, msg_id) + pb_bytes(7, transcript)
     return build_aa_packet(seq, 0x0B, 0x20, payload)
 
 
@@ -129,15 +199,17 @@ def build_transcription(seq, msg_id, text, is_final=False):
 # Teleprompter Service (0x06-20)
 # =============================================================================
 
+_DISPLAY_CONFIG = bytes.fromhex(
+    "0801121308021090" "4E1D00E094442500" "000000280030001213"
+    "0803100D0F1D0040" "8D44250000000028" "0030001212080410"
+    "001D0000884225" "00000000280030" "001212080510001D"
+    "00009242250000" "A242280030001212" "080610001D0000C6"
+    "42250000C4422800" "30001800"
+)
+
+
 def build_display_config(seq, msg_id):
-    config = bytes.fromhex(
-        "0801121308021090" "4E1D00E094442500" "000000280030001213"
-        "0803100D0F1D0040" "8D44250000000028" "0030001212080410"
-        "001D0000884225" "00000000280030" "001212080510001D"
-        "00009242250000" "A242280030001212" "080610001D0000C6"
-        "42250000C4422800" "30001800"
-    )
-    payload = bytes([0x08, 0x02, 0x10]) + encode_varint(msg_id) + bytes([0x22, 0x6A]) + config
+    payload = b"\x08\x02\x10" + encode_varint(msg_id) + b"\x22\x6A" + _DISPLAY_CONFIG
     return build_aa_packet(seq, 0x0E, 0x20, payload)
 
 
@@ -180,27 +252,31 @@ def format_text_pages(title, message, chars_per_line=25, lines_per_page=10):
         if not paragraph.strip():
             lines.append("")
             continue
-        words = paragraph.split()
-        current = ""
-        for word in words:
-            if len(current) + len(word) + 1 > chars_per_line:
+        # Words of the line being filled; width counts one trailing space each
+        current = []
+        width = 0
+        for word in paragraph.split():
+            if width + len(word) + 1 > chars_per_line:
                 if current:
-                    lines.append(current.strip())
-                current = word + " "
+                    lines.append(" ".join(current))
+                current = [word]
+                width = len(word) + 1
             else:
-                current += word + " "
-        if current.strip():
-            lines.append(current.strip())
-    while len(lines) < lines_per_page:
-        lines.append(" ")
+                current.append(word)
+                width += len(word) + 1
+        if current:
+            lines.append(" ".join(current))
+    if len(lines) < lines_per_page:
+        lines.extend([" "] * (lines_per_page - len(lines)))
     pages = []
     for i in range(0, len(lines), lines_per_page):
         page_lines = lines[i : i + lines_per_page]
-        while len(page_lines) < lines_per_page:
-            page_lines.append(" ")
+        if len(page_lines) < lines_per_page:
+            page_lines.extend([" "] * (lines_per_page - len(page_lines)))
         pages.append("\n".join(page_lines) + " \n")
-    while len(pages) < 14:
-        pages.append("\n".join([" "] * lines_per_page) + " \n")
+    if len(pages) < 14:
+        blank_page = "\n".join([" "] * lines_per_page) + " \n"
+        pages.extend([blank_page] * (14 - len(pages)))
     return pages
 
 
@@ -208,9 +284,14 @@ def format_text_pages(title, message, chars_per_line=25, lines_per_page=10):
 # Navigation Service (0x08-20)
 # =============================================================================
 
+_NAV_CMD_START_UP = pb_varint(1, 5)
+_NAV_CMD_BASIC_INFO = pb_varint(1, 7)
+_NAV_CMD_EXIT = pb_varint(1, 12)
+
+
 def build_nav_startup(seq, msg_id):
     """APP_REQUEST_START_UP (cmd=5) — activate navigation mode."""
-    payload = pb_varint(1, 5) + pb_varint(2, msg_id)
+    payload = _NAV_CMD_START_UP + pb_varint(2, msg_id)
     return build_aa_packet(seq, 0x08, 0x20, payload)
 
 
@@ -226,13 +307,13 @@ def build_nav_basic_info(seq, msg_id, direction_idx=0, distance="",
     if eta: info += pb_string(6, eta)
     if speed: info += pb_string(7, speed)
     info += pb_varint(8, work_method)
-    payload = pb_varint(1, 7) + pb_varint(2, msg_id) + pb_bytes(5, info)
+    payload = _NAV_CMD_BASIC_INFO + pb_varint(2, msg_id) + pb_bytes(5, info)
     return build_aa_packet(seq, 0x08, 0x20, payload)
 
 
 def build_nav_exit(seq, msg_id):
     """APP_REQUEST_EXIT (cmd=12) — close navigation mode."""
-    payload = pb_varint(1, 12) + pb_varint(2, msg_id)
+    payload = _NAV_CMD_EXIT + pb_varint(2, msg_id)
     return build_aa_packet(seq, 0x08, 0x20, payload)
 
 
@@ -247,8 +328,11 @@ class GlassesManager:
         self.seq = 0x08
         self.msg_id = 0x14
         self._event_callback = None
+        self._emit_tasks: set[asyncio.Task] = set()
         self._lock = asyncio.Lock()
-        self._response_queues: list[asyncio.Queue] = []
+        # Notifications (hex) gathered while a send_raw call is waiting;
+        # None when nothing is collecting. Only one call runs at a time.
+        self._collected: Optional[list[str]] = None
 
     @property
     def connected(self) -> bool:
@@ -258,17 +342,19 @@ class GlassesManager:
         self._event_callback = callback
 
     def _emit(self, event: str, data: dict):
-        if self._event_callback:
-            asyncio.get_event_loop().call_soon(
-                lambda: asyncio.ensure_future(self._event_callback(event, data))
-            )
+        callback = self._event_callback
+        if callback is not None:
+            # Keep a reference so the task isn't collected before it runs
+            task = asyncio.create_task(callback(event, data))
+            self._emit_tasks.add(task)
+            task.add_done_callback(self._emit_tasks.discard)
 
     def _on_notify(self, sender, data: bytearray):
-        log.debug("BLE notify: %s (%d queues)", data.hex(), len(self._response_queues))
-        self._emit("response", {"raw": data.hex()})
-        # Collect for pending waiters
-        for q in self._response_queues:
-            q.put_nowait(data)
+        raw = data.hex()
+        log.debug("BLE notify: %s", raw)
+        self._emit("response", {"raw": raw})
+        if self._collected is not None:
+            self._collected.append(raw)
 
     def _on_disconnect(self, client):
         log.info("BLE disconnected: %s", self.device_name)
@@ -355,30 +441,32 @@ class GlassesManager:
             total_lines = sum(1 for p in pages for ln in p.split("\n") if ln.strip())
 
             seq, msg_id = self._next()
-            await self._write(build_display_config(seq, msg_id))
-            await asyncio.sleep(0.3)
-
+            config = build_display_config(seq, msg_id)
             seq, msg_id = self._next()
-            await self._write(build_teleprompter_init(seq, msg_id, total_lines))
-            await asyncio.sleep(0.5)
+            init = build_teleprompter_init(seq, msg_id, total_lines)
 
+            # Pages, marker and sync are built up front; writes go out 50 ms
+            # apart, as write-without-response has no flow control on every backend.
+            burst = []
             for i in range(min(10, len(pages))):
                 seq, msg_id = self._next()
-                await self._write(build_content_page(seq, msg_id, i, pages[i]))
-                await asyncio.sleep(0.05)
-
+                burst.append(build_content_page(seq, msg_id, i, pages[i]))
             seq, msg_id = self._next()
-            await self._write(build_marker(seq, msg_id))
-            await asyncio.sleep(0.05)
-
+            burst.append(build_marker(seq, msg_id))
             for i in range(10, len(pages)):
                 seq, msg_id = self._next()
-                await self._write(build_content_page(seq, msg_id, i, pages[i]))
-                await asyncio.sleep(0.05)
-
+                burst.append(build_content_page(seq, msg_id, i, pages[i]))
             seq, msg_id = self._next()
-            await self._write(build_sync(seq, msg_id))
-            await asyncio.sleep(0.1)
+            burst.append(build_sync(seq, msg_id))
+
+            await self._write(config)
+            await asyncio.sleep(0.3)
+            await self._write(init)
+            await asyncio.sleep(0.5)
+            for pkt in burst:
+                await self._write(pkt)
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(0.05)
 
     async def start_navigation(self):
         """Activate navigation mode on the glasses."""
@@ -413,20 +501,17 @@ class GlassesManager:
             payload = bytes.fromhex(payload_hex)
             seq, msg_id = self._next()
             pkt = build_aa_packet(seq, svc_hi, svc_lo, payload)
-            log.info("sendRaw 0x%02X-0x%02X seq=%d pkt=%s", svc_hi, svc_lo, seq, pkt.hex())
+            if log.isEnabledFor(logging.INFO):
+                log.info("sendRaw 0x%02X-0x%02X seq=%d pkt=%s", svc_hi, svc_lo, seq, pkt.hex())
 
-            q: asyncio.Queue = asyncio.Queue()
-            self._response_queues.append(q)
+            self._collected = responses = []
             try:
                 await self._write(pkt)
                 await asyncio.sleep(wait)
-                responses = []
-                while not q.empty():
-                    responses.append(q.get_nowait().hex())
-                log.info("sendRaw collected %d responses", len(responses))
-                return responses
             finally:
-                self._response_queues.remove(q)
+                self._collected = None
+            log.info("sendRaw collected %d responses", len(responses))
+            return responses
 
     def status(self) -> dict:
         return {
@@ -439,88 +524,125 @@ class GlassesManager:
 # WebSocket Server
 # =============================================================================
 
+# Constant error bodies, shared by every response that needs them (they
+# are only ever serialized, never mutated)
+_ERR_TEXT_REQUIRED = {"code": "INVALID_PARAMS", "message": "text is required"}
+_ERR_BODY_REQUIRED = {"code": "INVALID_PARAMS", "message": "body is required"}
+_ERR_SVC_REQUIRED = {"code": "INVALID_PARAMS", "message": "svcHi and svcLo required"}
+_PARSE_ERROR_RESPONSE = {"error": {"code": "PARSE_ERROR", "message": "Invalid JSON"}}
+
+
 class BridgeServer:
+    # Broadcasts to more clients than this yield to the loop between batches
+    BROADCAST_BATCH = 50
+
     def __init__(self, host: str = "localhost", port: int = 8765):
         self.host = host
         self.port = port
         self.glasses = GlassesManager()
-        self.clients: set = set()
+        self.clients: list = []
+        self._methods = {
+            "connect": self._do_connect,
+            "disconnect": self._do_disconnect,
+            "setText": self._do_set_text,
+            "setTeleprompter": self._do_set_teleprompter,
+            "startNavigation": self._do_start_navigation,
+            "setNavigation": self._do_set_navigation,
+            "stopNavigation": self._do_stop_navigation,
+            "sendRaw": self._do_send_raw,
+            "getStatus": self._do_get_status,
+        }
 
     async def _broadcast(self, event: str, data: dict):
-        msg = json.dumps({"event": event, "data": data})
+        msg = _dumps({"event": event, "data": data})
+        clients = self.clients[:]
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Broadcast to %d clients: %s", len(clients), msg[:80])
         dead = set()
-        for ws in self.clients:
-            try:
-                await ws.send(msg)
-            except websockets.ConnectionClosed:
-                dead.add(ws)
-        self.clients -= dead
+        for start in range(0, len(clients), self.BROADCAST_BATCH):
+            if start:
+                # Let pending commands run between batches
+                await asyncio.sleep(0)
+            batch = clients[start:start + self.BROADCAST_BATCH]
+            results = await asyncio.gather(*(ws.send(msg) for ws in batch),
+                                           return_exceptions=True)
+            for ws, result in zip(batch, results):
+                if isinstance(result, websockets.ConnectionClosed):
+                    dead.add(ws)
+                elif isinstance(result, Exception):
+                    log.warning("Broadcast to client failed: %r", result)
+        if dead:
+            # Filter the live list, not the snapshot: clients may have
+            # joined while the sends were in flight
+            self.clients = [ws for ws in self.clients if ws not in dead]
+
+    async def _do_connect(self, cmd_id, params):
+        device = await self.glasses.connect()
+        return {"id": cmd_id, "result": {"ok": True, "device": device}}
+
+    async def _do_disconnect(self, cmd_id, params):
+        await self.glasses.disconnect()
+        return {"id": cmd_id, "result": {"ok": True}}
+
+    async def _do_set_text(self, cmd_id, params):
+        text = params.get("text", "")
+        if not text:
+            return {"id": cmd_id, "error": _ERR_TEXT_REQUIRED}
+        await self.glasses.set_text(text)
+        return {"id": cmd_id, "result": {"ok": True}}
+
+    async def _do_set_teleprompter(self, cmd_id, params):
+        title = params.get("title", "")
+        body = params.get("body", "")
+        if not body:
+            return {"id": cmd_id, "error": _ERR_BODY_REQUIRED}
+        await self.glasses.set_teleprompter(title, body)
+        return {"id": cmd_id, "result": {"ok": True}}
+
+    async def _do_start_navigation(self, cmd_id, params):
+        await self.glasses.start_navigation()
+        return {"id": cmd_id, "result": {"ok": True}}
+
+    async def _do_set_navigation(self, cmd_id, params):
+        await self.glasses.set_navigation(
+            direction=params.get("direction", 0),
+            distance=params.get("distance", ""),
+            road=params.get("road", ""),
+            eta=params.get("eta", ""),
+            speed=params.get("speed", ""),
+            remain_dist=params.get("remainDistance", ""),
+            spend_time=params.get("spendTime", ""),
+        )
+        return {"id": cmd_id, "result": {"ok": True}}
+
+    async def _do_stop_navigation(self, cmd_id, params):
+        await self.glasses.stop_navigation()
+        return {"id": cmd_id, "result": {"ok": True}}
+
+    async def _do_send_raw(self, cmd_id, params):
+        svc_hi = params.get("svcHi")
+        svc_lo = params.get("svcLo")
+        payload = params.get("payload", "")
+        wait = params.get("wait", 1.0)
+        if svc_hi is None or svc_lo is None:
+            return {"id": cmd_id, "error": _ERR_SVC_REQUIRED}
+        responses = await self.glasses.send_raw(svc_hi, svc_lo, payload, wait)
+        return {"id": cmd_id, "result": {"ok": True, "responses": responses}}
+
+    async def _do_get_status(self, cmd_id, params):
+        return {"id": cmd_id, "result": self.glasses.status()}
 
     async def _handle_command(self, msg: dict) -> dict:
         cmd_id = msg.get("id")
         method = msg.get("method")
         params = msg.get("params", {})
 
-        try:
-            if method == "connect":
-                device = await self.glasses.connect()
-                return {"id": cmd_id, "result": {"ok": True, "device": device}}
-
-            elif method == "disconnect":
-                await self.glasses.disconnect()
-                return {"id": cmd_id, "result": {"ok": True}}
-
-            elif method == "setText":
-                text = params.get("text", "")
-                if not text:
-                    return {"id": cmd_id, "error": {"code": "INVALID_PARAMS", "message": "text is required"}}
-                await self.glasses.set_text(text)
-                return {"id": cmd_id, "result": {"ok": True}}
-
-            elif method == "setTeleprompter":
-                title = params.get("title", "")
-                body = params.get("body", "")
-                if not body:
-                    return {"id": cmd_id, "error": {"code": "INVALID_PARAMS", "message": "body is required"}}
-                await self.glasses.set_teleprompter(title, body)
-                return {"id": cmd_id, "result": {"ok": True}}
-
-            elif method == "startNavigation":
-                await self.glasses.start_navigation()
-                return {"id": cmd_id, "result": {"ok": True}}
-
-            elif method == "setNavigation":
-                await self.glasses.set_navigation(
-                    direction=params.get("direction", 0),
-                    distance=params.get("distance", ""),
-                    road=params.get("road", ""),
-                    eta=params.get("eta", ""),
-                    speed=params.get("speed", ""),
-                    remain_dist=params.get("remainDistance", ""),
-                    spend_time=params.get("spendTime", ""),
-                )
-                return {"id": cmd_id, "result": {"ok": True}}
-
-            elif method == "stopNavigation":
-                await self.glasses.stop_navigation()
-                return {"id": cmd_id, "result": {"ok": True}}
-
-            elif method == "sendRaw":
-                svc_hi = params.get("svcHi")
-                svc_lo = params.get("svcLo")
-                payload = params.get("payload", "")
-                wait = params.get("wait", 1.0)
-                if svc_hi is None or svc_lo is None:
-                    return {"id": cmd_id, "error": {"code": "INVALID_PARAMS", "message": "svcHi and svcLo required"}}
-                responses = await self.glasses.send_raw(svc_hi, svc_lo, payload, wait)
-                return {"id": cmd_id, "result": {"ok": True, "responses": responses}}
-
-            elif method == "getStatus":
-                return {"id": cmd_id, "result": self.glasses.status()}
-
-            else:
-                return {"id": cmd_id, "error": {"code": "UNKNOWN_METHOD", "message": f"Unknown method: {method}"}}
+        handler = self._methods.get(method) if isinstance(method, str) else None
+        if handler is None:
+            return {"id": cmd_id, "error": {"code": "UNKNOWN_METHOD", "message": f"Unknown method: {method}"}}
 
+        try:
+            return await handler(cmd_id, params)
         except RuntimeError as e:
             code = "NOT_CONNECTED" if "Not connected" in str(e) else "BLE_ERROR"
             return {"id": cmd_id, "error": {"code": code, "message": str(e)}}
@@ -528,28 +650,42 @@ class BridgeServer:
             log.exception("Command error")
             return {"id": cmd_id, "error": {"code": "INTERNAL", "message": str(e)}}
 
+    async def _send(self, ws, obj: dict):
+        await ws.send(_dumps(obj))
+
+    async def _frames(self, ws):
+        if not _RECV_RAW:
+            async for raw in ws:
+                yield raw
+            return
+        while True:
+            yield await ws.recv(decode=False)
+
     async def _handler(self, ws):
-        self.clients.add(ws)
+        self.clients.append(ws)
         log.info("Client connected (%d total)", len(self.clients))
         try:
-            async for raw in ws:
+            async for raw in self._frames(ws):
                 try:
-                    msg = json.loads(raw)
-                except json.JSONDecodeError:
-                    await ws.send(json.dumps({"error": {"code": "PARSE_ERROR", "message": "Invalid JSON"}}))
+                    msg = _loads(raw)
+                except ValueError:  # bad JSON or, from raw frames, bad UTF-8
+                    await self._send(ws, _PARSE_ERROR_RESPONSE)
                     continue
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("Command: %s", str(msg)[:80])
                 resp = await self._handle_command(msg)
-                await ws.send(json.dumps(resp))
+                await self._send(ws, resp)
         except websockets.ConnectionClosed:
             pass
         finally:
-            self.clients.discard(ws)
+            if ws in self.clients:
+                self.clients.remove(ws)
             log.info("Client disconnected (%d remaining)", len(self.clients))
 
     async def run(self):
         self.glasses.on_event(self._broadcast)
         log.info("G2 Bridge starting on ws://%s:%d", self.host, self.port)
-        async with websockets.serve(self._handler, self.host, self.port):
+        async with ws_serve(self._handler, self.host, self.port):
             await asyncio.Future()  # run forever
 
 
@@ -565,8 +701,17 @@ def main():
         format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
     )
 
+    try:
+        import uvloop  # optional; faster event loop for the WebSocket I/O
+    except ImportError:
+        uvloop = None
+
     server = BridgeServer(host=args.host, port=args.port)
-    asyncio.run(server.run())
+    # uvloop.run (0.18+) replaces the deprecated uvloop.install()
+    if uvloop is not None and hasattr(uvloop, "run"):
+        uvloop.run(server.run())
+    else:
+        asyncio.run(server.run())
 
 
 if __name__ == "__main__":
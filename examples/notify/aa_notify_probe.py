@@ -9,7 +9,9 @@ the AA-header protocol frame, since it ignores raw UART entirely.
 import asyncio
 import json
 import time
-from bleak import BleakClient, BleakScanner
+from bleak import BleakClient
+
+from g2proto import WRITE_GAP, build_aa, build_auth_packets, encode_varint, find_g2, pb_bytes, pb_string, pb_varint
 
 UUID_BASE = "00002760-08c2-11e1-9073-0e8ac72e{:04x}"
 CHAR_WRITE = UUID_BASE.format(0x5401)
@@ -18,90 +20,63 @@ CHAR_DISPLAY_W = UUID_BASE.format(0x6401)
 CHAR_DISPLAY_N = UUID_BASE.format(0x6402)
 
 
-def crc16_ccitt(data, init=0xFFFF):
-    crc = init
-    for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
-            crc &= 0xFFFF
-    return crc
-
-
-def add_crc(packet):
-    crc = crc16_ccitt(packet[8:])
-    return packet + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
-
-
-def encode_varint(value):
-    result = []
-    while value > 0x7F:
-        result.append((value & 0x7F) | 0x80)
-        value >>= 7
-    result.append(value & 0x7F)
-    return bytes(result)
-
-
-def v(fn, val):
-    return bytes([(fn << 3) | 0]) + encode_varint(val)
-
-
-def s(fn, text):
-    data = text.encode('utf-8')
-    return bytes([(fn << 3) | 2]) + encode_varint(len(data)) + data
-
-
-def sub(fn, data):
-    return bytes([(fn << 3) | 2]) + encode_varint(len(data)) + data
-
-
-def b(fn, data):
-    return bytes([(fn << 3) | 2]) + encode_varint(len(data)) + data
-
-
-def build_aa(seq, svc_hi, svc_lo, payload):
-    header = bytes([0xAA, 0x21, seq, len(payload) + 2, 0x01, 0x01, svc_hi, svc_lo])
-    return add_crc(header + payload)
-
-
-def build_auth_packets():
-    timestamp = int(time.time())
-    ts = encode_varint(timestamp)
-    txid = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
-    p = []
-    p.append(add_crc(bytes([0xAA,0x21,0x01,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x0C,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x02,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x0E,0x22,0x02,0x08,0x02])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x0F,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x03,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    p.append(add_crc(bytes([0xAA,0x21,0x04,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x10,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x05,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x11,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x06,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x12,0x22,0x02,0x08,0x01])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x13,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x07,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    return p
+# Static NCS body for experiment 4, serialized once
+NCS_ADD_JSON = json.dumps({
+    "ncs_notification": {
+        "msg_id": 1,
+        "title": "Test",
+        "message": "Hello from Python!",
+        "app_identifier": "com.even.test",
+        "display_name": "Test",
+        "type": "Add"
+    }
+}, separators=(',', ':'))
 
 
 class T:
     def __init__(self):
         self.r = []
+        self.evt = asyncio.Event()
+
+    async def wait_responses(self, timeout, quiet=1.0):
+        """Wait up to `timeout` s after a write for its responses.
+
+        Returns early only once a response has arrived and `quiet` s pass
+        without another; the idle window is long enough that the later
+        packets of a multi-packet reply are still credited to this write.
+        Clear self.evt before the write being waited on.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        window = timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(self.evt.wait(), min(window, remaining))
+            except asyncio.TimeoutError:
+                return
+            self.evt.clear()
+            window = quiet
+
     def h(self, label):
         def cb(_, data):
             st = ""
             if len(data) >= 2 and data[1] == 0xC9: st = " **SUCCESS**"
             elif len(data) >= 2 and data[1] == 0xCB: st = " **ACK**"
             svc = f"svc=0x{data[6]:02X}{data[7]:02X}" if len(data) >= 8 and data[0] == 0xAA else ""
-            print(f"  <- [{label}] ({len(data)}b): {data.hex()[:60]}{'...' if len(data.hex())>60 else ''} {svc}{st}")
+            print(f"  <- [{label}] ({len(data)}b): {data[:30].hex()}{'...' if len(data) > 30 else ''} {svc}{st}")
             self.r.append((label, bytes(data)))
+            self.evt.set()
         return cb
 
 
 async def main():
     print("Scanning...")
-    devices = await BleakScanner.discover(timeout=10.0)
-    g2 = [d for d in devices if d.name and "G2" in d.name]
-    if not g2:
+    device = await find_g2()
+    if device is None:
         print("No G2!"); return
-    device = next((d for d in g2 if "_L_" in d.name), g2[0])
     print(f"Using: {device.name}\n")
 
     t = T()
@@ -116,7 +91,7 @@ async def main():
         print("Authenticating...")
         for pkt in build_auth_packets():
             await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-            await asyncio.sleep(0.1)
+            await asyncio.sleep(WRITE_GAP)
         await asyncio.sleep(1.0)
         print(f"Auth done ({len(t.r)} responses)\n")
 
@@ -148,42 +123,36 @@ async def main():
         seq += 1
 
         # --- Experiment 3: JSON as protobuf string field in notification service ---
-        payload = v(1, 1) + v(2, msg_id) + sub(3,
-            v(1, 0x1A) + v(2, 1) + b(3, notification_json))
+        notif_data = b"".join((pb_varint(1, 0x1A), pb_varint(2, 1), pb_bytes(3, notification_json)))
+        payload = b"".join((pb_varint(1, 1), pb_varint(2, msg_id), pb_bytes(3, notif_data)))
         experiments.append(("JSON in proto field[0x02-20]",
             build_aa(seq, 0x02, 0x20, payload)))
         seq += 1; msg_id += 1
 
         # --- Experiment 4: NCS notification as protobuf string ---
-        payload = v(1, 1) + v(2, msg_id) + s(3, json.dumps({
-            "ncs_notification": {
-                "msg_id": 1,
-                "title": "Test",
-                "message": "Hello from Python!",
-                "app_identifier": "com.even.test",
-                "display_name": "Test",
-                "type": "Add"
-            }
-        }, separators=(',', ':')))
+        payload = b"".join((pb_varint(1, 1), pb_varint(2, msg_id), pb_string(3, NCS_ADD_JSON)))
         experiments.append(("NCS string in proto field 3",
             build_aa(seq, 0x02, 0x20, payload)))
         seq += 1; msg_id += 1
 
         # --- Experiment 5: Notification with ALL possible text fields ---
-        notif_data = (
-            v(1, 0x1A) + v(2, 1) +
-            s(3, "Test") + s(4, "Hello from Python!") +
-            s(5, "com.even.test") + s(6, "Test") +
-            s(7, "") + v(8, int(time.time()))
-        )
-        payload = v(1, 1) + v(2, msg_id) + sub(3, notif_data)
+        notif_data = b"".join((
+            pb_varint(1, 0x1A), pb_varint(2, 1),
+            pb_string(3, "Test"), pb_string(4, "Hello from Python!"),
+            pb_string(5, "com.even.test"), pb_string(6, "Test"),
+            pb_string(7, ""), pb_varint(8, int(time.time())),
+        ))
+        payload = b"".join((pb_varint(1, 1), pb_varint(2, msg_id), pb_bytes(3, notif_data)))
         experiments.append(("Extended fields 3-8 [0x02-20]",
             build_aa(seq, 0x02, 0x20, payload)))
         seq += 1; msg_id += 1
 
         # --- Experiment 6: Type=2 notification (maybe type 2 = text notif) ---
-        notif_data = v(1, 0x1A) + v(2, 1) + s(3, "Test") + s(4, "Hello from Python!")
-        payload = v(1, 2) + v(2, msg_id) + sub(3, notif_data)
+        notif_data = b"".join((
+            pb_varint(1, 0x1A), pb_varint(2, 1),
+            pb_string(3, "Test"), pb_string(4, "Hello from Python!"),
+        ))
+        payload = b"".join((pb_varint(1, 2), pb_varint(2, msg_id), pb_bytes(3, notif_data)))
         experiments.append(("Type=2 notification",
             build_aa(seq, 0x02, 0x20, payload)))
         seq += 1; msg_id += 1
@@ -194,7 +163,8 @@ async def main():
         seq += 1
 
         # --- Experiment 8: Conversate with type=2 (maybe AI response mode) ---
-        payload = v(1, 2) + v(2, msg_id) + sub(7, s(1, "Test: Hello from Python!") + v(2, 1))
+        transcript = pb_string(1, "Test: Hello from Python!") + pb_varint(2, 1)
+        payload = b"".join((pb_varint(1, 2), pb_varint(2, msg_id), pb_bytes(7, transcript)))
         experiments.append(("Conversate type=2",
             build_aa(seq, 0x0B, 0x20, payload)))
         seq += 1; msg_id += 1
@@ -207,12 +177,12 @@ async def main():
 
         # --- Experiment 10: AI result as raw protobuf with screen fields ---
         # From EvenDemoApp: sendResult includes screen_status and new_screen
-        ai_payload = (
-            v(1, 1) + v(2, msg_id) +
-            sub(3, s(1, "Test: Hello from Python!")) +
-            v(4, 1) +  # screen_status?
-            v(5, 1)    # new_screen?
-        )
+        ai_payload = b"".join((
+            pb_varint(1, 1), pb_varint(2, msg_id),
+            pb_bytes(3, pb_string(1, "Test: Hello from Python!")),
+            pb_varint(4, 1),  # screen_status?
+            pb_varint(5, 1),  # new_screen?
+        ))
         experiments.append(("AI result proto [0x0B-20]",
             build_aa(seq, 0x0B, 0x20, ai_payload)))
         seq += 1; msg_id += 1
@@ -233,13 +203,14 @@ async def main():
                 char = CHAR_WRITE
 
             print(f"\n  [{name}] -> {char[-4:]} ({len(pkt)}b)")
+            t.evt.clear()
             try:
                 await client.write_gatt_char(char, pkt, response=False)
             except Exception as e:
                 print(f"    Error: {e}")
                 continue
 
-            await asyncio.sleep(1.5)
+            await t.wait_responses(1.5)
             new = len(t.r) - before
             if new > 0:
                 print(f"    ** {new} RESPONSE(S)! **")
@@ -253,7 +224,7 @@ async def main():
         print(f"\n{'=' * 60}")
         print(f"TOTAL: {len(t.r)} responses ({len(t.r) - initial} from experiments)")
         for label, data in t.r[initial:]:
-            print(f"  [{label}] {data.hex()[:60]}")
+            print(f"  [{label}] {data[:30].hex()}")
 
         print("\n  Check glasses for any display!")
         await asyncio.sleep(2.0)
@@ -9,7 +9,9 @@ dashboard commands are accepted.
 
 import asyncio
 import time
-from bleak import BleakClient, BleakScanner
+from bleak import BleakClient
+
+from g2proto import WRITE_GAP, add_crc, build_auth_packets, find_g2
 
 UUID_BASE = "00002760-08c2-11e1-9073-0e8ac72e{:04x}"
 
@@ -33,57 +35,12 @@ NUS_RX = "6e400002-b5a3-f393-e0a9-e50e24dcca9e"  # write
 NUS_TX = "6e400003-b5a3-f393-e0a9-e50e24dcca9e"  # notify
 
 
-def crc16_ccitt(data, init=0xFFFF):
-    crc = init
-    for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
-            crc &= 0xFFFF
-    return crc
-
-def add_crc(packet):
-    crc = crc16_ccitt(packet[8:])
-    return packet + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
-
-def encode_varint(value):
-    result = []
-    while value > 0x7F:
-        result.append((value & 0x7F) | 0x80)
-        value >>= 7
-    result.append(value & 0x7F)
-    return bytes(result)
-
-def build_auth_packets():
-    timestamp = int(time.time())
-    ts = encode_varint(timestamp)
-    txid = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
-    p = []
-    p.append(add_crc(bytes([0xAA,0x21,0x01,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x0C,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x02,0x0A,0x01,0x01,0x80,0x20,
-        0x08,0x05,0x10,0x0E,0x22,0x02,0x08,0x02])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x0F,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x03,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    p.append(add_crc(bytes([0xAA,0x21,0x04,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x10,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x05,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x11,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x06,0x0A,0x01,0x01,0x80,0x20,
-        0x08,0x05,0x10,0x12,0x22,0x02,0x08,0x01])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x13,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x07,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    return p
-
-
 async def main():
     print("Scanning for Even G2 glasses...")
-    devices = await BleakScanner.discover(timeout=10.0)
-    g2 = [d for d in devices if d.name and "G2" in d.name]
-    if not g2:
+    device = await find_g2()
+    if device is None:
         print("No G2 glasses found!")
         return
-    device = next((d for d in g2 if "_L_" in d.name), g2[0])
     print(f"Using: {device.name}\n")
 
     traffic = {ch: [] for ch in CHANNELS}
@@ -100,7 +57,7 @@ async def main():
                 result_code = (status >> 1) & 0x0F
                 notify_flag = status & 0x01
                 svc_info = f" svc=0x{svc_id:02X} result={result_code} notify={notify_flag}"
-            print(f"  <- [{label}] ({len(data):3d}b){svc_info}: {data.hex()[:80]}")
+            print(f"  <- [{label}] ({len(data):3d}b){svc_info}: {data[:40].hex()}")
         return cb
 
     async with BleakClient(device) as client:
@@ -134,7 +91,7 @@ async def main():
         print("Authenticating on 0x5401...")
         for pkt in build_auth_packets():
             await client.write_gatt_char(WRITE_CHANNELS["5401"], pkt, response=False)
-            await asyncio.sleep(0.1)
+            await asyncio.sleep(WRITE_GAP)
         await asyncio.sleep(1.0)
         post_auth = sum(len(v) for v in traffic.values())
         print(f"  Post-auth traffic: {post_auth} packets\n")
@@ -144,7 +101,7 @@ async def main():
         try:
             for pkt in build_auth_packets():
                 await client.write_gatt_char(WRITE_CHANNELS["0001"], pkt, response=False)
-                await asyncio.sleep(0.1)
+                await asyncio.sleep(WRITE_GAP)
             await asyncio.sleep(1.0)
         except Exception as e:
             print(f"  Error: {e}")
@@ -197,7 +154,7 @@ async def main():
                         svc_id = data[6]
                         status = data[7]
                         svc_info = f" svc=0x{svc_id:02X} st=0x{status:02X}"
-                    print(f"    ({len(data):3d}b){svc_info}: {data.hex()[:80]}")
+                    print(f"    ({len(data):3d}b){svc_info}: {data[:40].hex()}")
                 if len(packets) > 10:
                     print(f"    ... and {len(packets) - 10} more")
 
@@ -12,84 +12,30 @@ Protocol (from capture analysis):
 """
 
 import asyncio
-import time
+from collections import deque
 from bleak import BleakClient, BleakScanner
 
+from g2proto import WRITE_GAP, build_aa, build_auth_packets, find_g2, load_cached_lenses, pb_bytes, pb_string, pb_varint, save_cached_lenses
+
 UUID_BASE = "00002760-08c2-11e1-9073-0e8ac72e{:04x}"
 CHAR_WRITE = UUID_BASE.format(0x5401)
 CHAR_NOTIFY = UUID_BASE.format(0x5402)
 CHAR_DISPLAY_N = UUID_BASE.format(0x6402)
 
 
-def crc16_ccitt(data, init=0xFFFF):
-    crc = init
-    for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
-            crc &= 0xFFFF
-    return crc
-
-
-def add_crc(packet):
-    crc = crc16_ccitt(packet[8:])
-    return packet + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
-
-
-def encode_varint(value):
-    result = []
-    while value > 0x7F:
-        result.append((value & 0x7F) | 0x80)
-        value >>= 7
-    result.append(value & 0x7F)
-    return bytes(result)
-
-
-def build_aa(seq, svc_hi, svc_lo, payload):
-    header = bytes([0xAA, 0x21, seq, len(payload) + 2, 0x01, 0x01, svc_hi, svc_lo])
-    return add_crc(header + payload)
-
-
-def build_auth_packets():
-    timestamp = int(time.time())
-    ts = encode_varint(timestamp)
-    txid = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
-    p = []
-    p.append(add_crc(bytes([0xAA,0x21,0x01,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x0C,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x02,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x0E,0x22,0x02,0x08,0x02])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x0F,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x03,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    p.append(add_crc(bytes([0xAA,0x21,0x04,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x10,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x05,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x11,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x06,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x12,0x22,0x02,0x08,0x01])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x13,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x07,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    return p
-
-
-def pb_varint(field, value):
-    return bytes([(field << 3) | 0]) + encode_varint(value)
-
-def pb_bytes(field, data):
-    return bytes([(field << 3) | 2]) + encode_varint(len(data)) + data
-
-def pb_string(field, text):
-    return pb_bytes(field, text.encode('utf-8'))
-
-
 def build_conversate_config(msg_id):
     """Build type=1 Conversate session start (exact captured format)."""
     # field 3 = {field 1=1, field 2={field 1=1, field 2=1, field 3=1, field 4=1}}
-    inner_settings = pb_varint(1, 1) + pb_varint(2, 1) + pb_varint(3, 1) + pb_varint(4, 1)
+    inner_settings = b"".join((pb_varint(1, 1), pb_varint(2, 1), pb_varint(3, 1), pb_varint(4, 1)))
     session = pb_varint(1, 1) + pb_bytes(2, inner_settings)
-    return pb_varint(1, 1) + pb_varint(2, msg_id) + pb_bytes(3, session)
+    return b"".join((pb_varint(1, 1), pb_varint(2, msg_id), pb_bytes(3, session)))
 
 
 def build_transcription(msg_id, text, is_final=False):
     """Build type=5 speech transcription packet."""
     # field 7 = {field 1 = text, field 2 = is_final}
     transcript = pb_string(1, text) + pb_varint(2, 1 if is_final else 0)
-    return pb_varint(1, 5) + pb_varint(2, msg_id) + pb_bytes(7, transcript)
+    return b"".join((pb_varint(1, 5), pb_varint(2, msg_id), pb_bytes(7, transcript)))
 
 
 # Exact captured packets for reference
@@ -99,9 +45,77 @@ CAPTURED_FINAL = bytes.fromhex(
 )
 
 
+# =============================================================================
+# Experiment plans: every packet is built up front as (packet, note, delay)
+# so the send loop only does BLE I/O. Each step consumes one seq/msg_id.
+# =============================================================================
+
+def plan_captured(seq):
+    """EXP 1: exact captured config + final transcription."""
+    config = build_aa(seq, 0x0B, 0x20, CAPTURED_CONFIG)
+    text = build_aa(seq + 1, 0x0B, 0x20, CAPTURED_FINAL)
+    return [
+        (config, f"  Config: {config[:25].hex()}...", 0.5),
+        (text, f"  Text: {text[:25].hex()}...", 2.0),
+    ]
+
+
+def plan_progressive(seq, msg_id, texts, fmt, delay):
+    """Transcription updates, one packet per text; the last one is final."""
+    plan = []
+    last = len(texts) - 1
+    for i, text in enumerate(texts):
+        is_final = i == last
+        pkt = build_aa(seq + i, 0x0B, 0x20, build_transcription(msg_id + i, text, is_final))
+        plan.append((pkt, fmt.format(text, '[FINAL]' if is_final else ''), delay))
+    return plan
+
+
+def plan_config_progressive(seq, msg_id, texts):
+    """EXP 2: session config, then progressive transcription."""
+    pkt = build_aa(seq, 0x0B, 0x20, build_conversate_config(msg_id))
+    return [(pkt, f"  Config ({len(pkt)}b)", 0.5)] + plan_progressive(
+        seq + 1, msg_id + 1, texts, '  Trans: "{}" {}', 0.3)
+
+
+def plan_direct(seq, msg_id, text):
+    """EXP 3: a single final transcription without session config."""
+    pkt = build_aa(seq, 0x0B, 0x20, build_transcription(msg_id, text, is_final=True))
+    return [(pkt, f"  Direct ({len(pkt)}b)", 2.0)]
+
+
+def plan_captured_sequence(seq, msg_id, texts):
+    """EXP 4: config, empty transcription, then progressive text."""
+    config = build_aa(seq, 0x0B, 0x20, build_conversate_config(msg_id))
+    empty = build_aa(seq + 1, 0x0B, 0x20, build_transcription(msg_id + 1, "", is_final=False))
+    return [(config, None, 0.3), (empty, "  Empty start", 0.5)] + plan_progressive(
+        seq + 2, msg_id + 2, texts, '  "{}" {}', 0.4)
+
+
+def plan_ai_response(seq, msg_id, text, screen=False):
+    """EXP 5/6: type=2 AI response, optionally with screen_status fields."""
+    parts = [pb_varint(1, 2), pb_varint(2, msg_id), pb_bytes(3, pb_string(1, text))]
+    if screen:
+        parts += [pb_varint(4, 1),   # screen_status
+                  pb_varint(5, 1)]   # new_screen
+    pkt = build_aa(seq, 0x0B, 0x20, b"".join(parts))
+    note = f"  AI+screen ({len(pkt)}b)" if screen else f"  AI response ({len(pkt)}b)"
+    return [(pkt, note, 2.0)]
+
+
+async def send_plan(client, plan):
+    for pkt, note, delay in plan:
+        if note:
+            print(note)
+        await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
+        await asyncio.sleep(delay)
+
+
 class Tracker:
     def __init__(self):
-        self.r = []
+        # Only recent responses are kept; count is the running total
+        self.r = deque(maxlen=512)
+        self.count = 0
     def h(self, label):
         def cb(_, data):
             st = ""
@@ -111,23 +125,33 @@ class Tracker:
                 elif data[1] == 0xCB: st = " **ACK**"
             if len(data) >= 8 and data[0] == 0xAA:
                 svc = f" svc=0x{data[6]:02X}-{data[7]:02X}"
-            print(f"  <- [{label}] ({len(data)}b): {data.hex()[:60]}{svc}{st}")
+            print(f"  <- [{label}] ({len(data)}b): {data[:30].hex()}{svc}{st}")
             self.r.append((label, bytes(data)))
+            self.count += 1
         return cb
 
 
+async def find_device():
+    """Find the left lens, trying the cached address before a full scan."""
+    cached = load_cached_lenses().get("left")
+    if cached:
+        device = await BleakScanner.find_device_by_address(cached, timeout=3.0)
+        if device is not None:
+            return device
+    return await find_g2()
+
+
 async def main():
     print("Scanning for Even G2 glasses...")
-    devices = await BleakScanner.discover(timeout=10.0)
-    g2 = [d for d in devices if d.name and "G2" in d.name]
-    if not g2:
+    device = await find_device()
+    if device is None:
         print("No G2 glasses found!")
         return
-    device = next((d for d in g2 if "_L_" in d.name), g2[0])
     print(f"Using: {device.name}\n")
 
     t = Tracker()
     async with BleakClient(device) as client:
+        save_cached_lenses(device)
         await client.start_notify(CHAR_NOTIFY, t.h("5402"))
         await client.start_notify(CHAR_DISPLAY_N, t.h("6402"))
 
@@ -135,9 +159,9 @@ async def main():
         print("Authenticating...")
         for pkt in build_auth_packets():
             await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-            await asyncio.sleep(0.1)
+            await asyncio.sleep(WRITE_GAP)
         await asyncio.sleep(1.0)
-        print(f"Auth done ({len(t.r)} responses)\n")
+        print(f"Auth done ({t.count} responses)\n")
 
         seq = 0x08
         msg_id = 0x14
@@ -148,20 +172,12 @@ async def main():
         print("=" * 60)
         print("EXP 1: Captured config + 'I love Denon receivers.'")
         print("=" * 60)
-        before = len(t.r)
-
-        pkt = build_aa(seq, 0x0B, 0x20, CAPTURED_CONFIG)
-        print(f"  Config: {pkt.hex()[:50]}...")
-        await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-        seq += 1
-        await asyncio.sleep(0.5)
+        before = t.count
 
-        pkt = build_aa(seq, 0x0B, 0x20, CAPTURED_FINAL)
-        print(f"  Text: {pkt.hex()[:50]}...")
-        await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-        seq += 1
-        await asyncio.sleep(2.0)
-        print(f"  Responses: {len(t.r) - before}")
+        plan = plan_captured(seq)
+        await send_plan(client, plan)
+        seq += len(plan)
+        print(f"  Responses: {t.count - before}")
 
         # ====================================================================
         # Experiment 2: Config + progressive transcription
@@ -169,31 +185,18 @@ async def main():
         print("\n" + "=" * 60)
         print("EXP 2: Config + progressive 'Hello from Python!'")
         print("=" * 60)
-        before = len(t.r)
+        before = t.count
 
-        # Start session
-        config = build_conversate_config(msg_id)
-        pkt = build_aa(seq, 0x0B, 0x20, config)
-        print(f"  Config ({len(pkt)}b)")
-        await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-        seq += 1; msg_id += 1
-        await asyncio.sleep(0.5)
-
-        # Progressive transcription (simulating speech-to-text)
+        # Start session, then progressive transcription (simulating speech-to-text)
         progressive = ["H", "He", "Hell", "Hello", "Hello from",
                         "Hello from Py", "Hello from Python",
                         "Hello from Python!"]
-        for i, text in enumerate(progressive):
-            is_final = (i == len(progressive) - 1)
-            trans = build_transcription(msg_id, text, is_final)
-            pkt = build_aa(seq, 0x0B, 0x20, trans)
-            print(f"  Trans: \"{text}\" {'[FINAL]' if is_final else ''}")
-            await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-            seq += 1; msg_id += 1
-            await asyncio.sleep(0.3)
+        plan = plan_config_progressive(seq, msg_id, progressive)
+        await send_plan(client, plan)
+        seq += len(plan); msg_id += len(plan)
 
         await asyncio.sleep(2.0)
-        print(f"  Responses: {len(t.r) - before}")
+        print(f"  Responses: {t.count - before}")
 
         # ====================================================================
         # Experiment 3: Direct transcription without config
@@ -201,15 +204,12 @@ async def main():
         print("\n" + "=" * 60)
         print("EXP 3: Direct transcription 'Test notification!'")
         print("=" * 60)
-        before = len(t.r)
+        before = t.count
 
-        trans = build_transcription(msg_id, "Test notification!", is_final=True)
-        pkt = build_aa(seq, 0x0B, 0x20, trans)
-        print(f"  Direct ({len(pkt)}b)")
-        await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-        seq += 1; msg_id += 1
-        await asyncio.sleep(2.0)
-        print(f"  Responses: {len(t.r) - before}")
+        plan = plan_direct(seq, msg_id, "Test notification!")
+        await send_plan(client, plan)
+        seq += len(plan); msg_id += len(plan)
+        print(f"  Responses: {t.count - before}")
 
         # ====================================================================
         # Experiment 4: Exact captured sequence (config + empty + progressive)
@@ -217,36 +217,18 @@ async def main():
         print("\n" + "=" * 60)
         print("EXP 4: Full captured sequence (config -> empty -> text)")
         print("=" * 60)
-        before = len(t.r)
+        before = t.count
 
-        # Config
-        config = build_conversate_config(msg_id)
-        pkt = build_aa(seq, 0x0B, 0x20, config)
-        await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-        seq += 1; msg_id += 1
-        await asyncio.sleep(0.3)
-
-        # Empty transcription (like capture's seq 0x08 - start of listening)
-        trans = build_transcription(msg_id, "", is_final=False)
-        pkt = build_aa(seq, 0x0B, 0x20, trans)
-        print(f"  Empty start")
-        await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-        seq += 1; msg_id += 1
-        await asyncio.sleep(0.5)
-
-        # Progressive
-        for text in ["G", "G2", "G2 not", "G2 notification",
-                      "G2 notification test", "G2 notification test."]:
-            is_final = text.endswith(".")
-            trans = build_transcription(msg_id, text, is_final)
-            pkt = build_aa(seq, 0x0B, 0x20, trans)
-            print(f"  \"{text}\" {'[FINAL]' if is_final else ''}")
-            await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-            seq += 1; msg_id += 1
-            await asyncio.sleep(0.4)
+        # Config, empty transcription (like capture's seq 0x08 - start of
+        # listening), then progressive text
+        plan = plan_captured_sequence(seq, msg_id, [
+            "G", "G2", "G2 not", "G2 notification",
+            "G2 notification test", "G2 notification test."])
+        await send_plan(client, plan)
+        seq += len(plan); msg_id += len(plan)
 
         await asyncio.sleep(2.0)
-        print(f"  Responses: {len(t.r) - before}")
+        print(f"  Responses: {t.count - before}")
 
         # ====================================================================
         # Experiment 5: Type=2 AI response (field 3 with text)
@@ -254,17 +236,13 @@ async def main():
         print("\n" + "=" * 60)
         print("EXP 5: Type=2 AI response with text field")
         print("=" * 60)
-        before = len(t.r)
+        before = t.count
 
         # Try type=2 with text in field 3 (AI result)
-        ai_text = pb_string(1, "This is a test AI response displayed on G2 glasses.")
-        payload = pb_varint(1, 2) + pb_varint(2, msg_id) + pb_bytes(3, ai_text)
-        pkt = build_aa(seq, 0x0B, 0x20, payload)
-        print(f"  AI response ({len(pkt)}b)")
-        await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-        seq += 1; msg_id += 1
-        await asyncio.sleep(2.0)
-        print(f"  Responses: {len(t.r) - before}")
+        plan = plan_ai_response(seq, msg_id, "This is a test AI response displayed on G2 glasses.")
+        await send_plan(client, plan)
+        seq += len(plan); msg_id += len(plan)
+        print(f"  Responses: {t.count - before}")
 
         # ====================================================================
         # Experiment 6: Type=2 AI response with screen_status fields
@@ -272,30 +250,23 @@ async def main():
         print("\n" + "=" * 60)
         print("EXP 6: Type=2 AI response + screen fields")
         print("=" * 60)
-        before = len(t.r)
-
-        ai_text = pb_string(1, "Hello from Python!")
-        payload = (pb_varint(1, 2) + pb_varint(2, msg_id) +
-                   pb_bytes(3, ai_text) +
-                   pb_varint(4, 1) +   # screen_status
-                   pb_varint(5, 1))    # new_screen
-        pkt = build_aa(seq, 0x0B, 0x20, payload)
-        print(f"  AI+screen ({len(pkt)}b)")
-        await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-        seq += 1; msg_id += 1
-        await asyncio.sleep(2.0)
-        print(f"  Responses: {len(t.r) - before}")
+        before = t.count
+
+        plan = plan_ai_response(seq, msg_id, "Hello from Python!", screen=True)
+        await send_plan(client, plan)
+        seq += len(plan); msg_id += len(plan)
+        print(f"  Responses: {t.count - before}")
 
         # Final wait
         await asyncio.sleep(3.0)
 
         print(f"\n{'=' * 60}")
-        print(f"RESULTS: {len(t.r)} total responses")
+        print(f"RESULTS: {t.count} total responses")
         for label, data in t.r:
             svc = ""
             if len(data) >= 8 and data[0] == 0xAA:
                 svc = f" svc=0x{data[6]:02X}-{data[7]:02X}"
-            print(f"  [{label}] {data.hex()[:60]}{svc}")
+            print(f"  [{label}] {data[:30].hex()}{svc}")
         print(f"\nCheck glasses for any text display!")
 
 
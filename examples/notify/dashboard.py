@@ -23,17 +23,19 @@ Usage:
 
 import argparse
 import asyncio
+import contextlib
 import json
 import os
-import struct
 import sys
 import time
 import urllib.request
+from collections import deque
 
 from bleak import BleakClient, BleakScanner
 
 # Add this dir to path for protobuf imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from g2proto import CACHE_DIR, WRITE_GAP, build_aa, build_auth_packets, encode_varint, load_cached_lenses, read_cache, save_cached_lenses, write_cache
 from pbgen import dashboard_pb2
 
 
@@ -48,112 +50,56 @@ CHAR_DISPLAY_N = UUID_BASE.format(0x6402)
 
 
 # =============================================================================
-# AA-Header Protocol
+# Activation packets (raw payloads from BLE capture, non-dashboard services)
 # =============================================================================
 
-def crc16_ccitt(data, init=0xFFFF):
-    crc = init
-    for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
-            crc &= 0xFFFF
-    return crc
-
-
-def add_crc(packet):
-    crc = crc16_ccitt(packet[8:])
-    return packet + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
-
-
-def encode_varint(value):
-    result = []
-    while value > 0x7F:
-        result.append((value & 0x7F) | 0x80)
-        value >>= 7
-    result.append(value & 0x7F)
-    return bytes(result)
-
-
-def build_aa_packet(seq, svc_hi, svc_lo, payload):
-    """Build AA-header packet with CRC."""
-    total_len = len(payload) + 2  # +2 for packet info (01 01)
-    header = bytes([0xAA, 0x21, seq & 0xFF, total_len, 0x01, 0x01, svc_hi, svc_lo])
-    return add_crc(header + payload)
-
-
-def build_auth_packets():
-    timestamp = int(time.time())
-    ts = encode_varint(timestamp)
-    txid = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
-    p = []
-    p.append(add_crc(bytes([0xAA,0x21,0x01,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x0C,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x02,0x0A,0x01,0x01,0x80,0x20,
-        0x08,0x05,0x10,0x0E,0x22,0x02,0x08,0x02])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x0F,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x03,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    p.append(add_crc(bytes([0xAA,0x21,0x04,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x10,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x05,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x11,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x06,0x0A,0x01,0x01,0x80,0x20,
-        0x08,0x05,0x10,0x12,0x22,0x02,0x08,0x01])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x13,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x07,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    return p
+# Everything after the msg_id varint is constant, so those tails are built
+# once and each call only encodes the msg_id.
+_SCREEN_MODE_TAIL = bytes([0x1A, 0x02, 0x08, 0x04])
+_DISPLAY_WAKE_INNER = bytes([0x08, 0x01, 0x10, 0x01, 0x18, 0x05, 0x28, 0x01])
+_DISPLAY_WAKE_TAIL = bytes([0x1A, len(_DISPLAY_WAKE_INNER)]) + _DISPLAY_WAKE_INNER
 
 
-# =============================================================================
-# Activation packets (raw payloads from BLE capture, non-dashboard services)
-# =============================================================================
-
 def build_dashboard_enable(seq, msg_id):
     """Service 0x0A-20: Enable dashboard mode."""
-    payload = bytes([0x08, 0x00]) + bytes([0x10]) + encode_varint(msg_id)
-    return build_aa_packet(seq, 0x0A, 0x20, payload)
+    payload = b"\x08\x00\x10" + encode_varint(msg_id)
+    return build_aa(seq, 0x0A, 0x20, payload)
 
 
 def build_dashboard_refresh(seq, msg_id):
     """Service 0x07-20: Refresh dashboard (type=10)."""
-    inner = bytes([0x08, 0x00, 0x10]) + encode_varint(msg_id)
-    payload = (bytes([0x08, 0x0A]) +
-               bytes([0x10]) + encode_varint(msg_id) +
-               bytes([0x6A, len(inner)]) + inner)
-    return build_aa_packet(seq, 0x07, 0x20, payload)
+    mid = encode_varint(msg_id)
+    inner = b"\x08\x00\x10" + mid
+    payload = b"".join((b"\x08\x0A\x10", mid, bytes([0x6A, len(inner)]), inner))
+    return build_aa(seq, 0x07, 0x20, payload)
 
 
 def build_screen_mode(seq, msg_id):
     """Service 0x10-20: Set screen mode (type=1, mode=4)."""
-    payload = (bytes([0x08, 0x01]) +
-               bytes([0x10]) + encode_varint(msg_id) +
-               bytes([0x1A, 0x02, 0x08, 0x04]))
-    return build_aa_packet(seq, 0x10, 0x20, payload)
+    payload = b"".join((b"\x08\x01\x10", encode_varint(msg_id), _SCREEN_MODE_TAIL))
+    return build_aa(seq, 0x10, 0x20, payload)
 
 
 def build_display_wake(seq, msg_id):
     """Service 0x04-20: Wake display to trigger rendering."""
-    inner = bytes([0x08, 0x01, 0x10, 0x01, 0x18, 0x05, 0x28, 0x01])
-    payload = (bytes([0x08, 0x01]) +
-               bytes([0x10]) + encode_varint(msg_id) +
-               bytes([0x1A, len(inner)]) + inner)
-    return build_aa_packet(seq, 0x04, 0x20, payload)
+    payload = b"".join((b"\x08\x01\x10", encode_varint(msg_id), _DISPLAY_WAKE_TAIL))
+    return build_aa(seq, 0x04, 0x20, payload)
+
+
+# Exact captured payload from scripted-session.log
+_DISPLAY_CONFIG = bytes.fromhex(
+    "080112130802104e1d001d4525000000002800300012130803100f1d006005"
+    "452500000000280030001212080410001d000042250000000028003000"
+    "1212080510001d0000422500000000280030001212080610001d0000"
+    "4225000000002800300018000000001c0000"
+)
+_DISPLAY_CONFIG_TAIL = bytes([0x22, len(_DISPLAY_CONFIG)]) + _DISPLAY_CONFIG
 
 
 def build_display_config(seq, msg_id):
     """Service 0x0E-20: Display config (captured, comes AFTER dashboard data)."""
-    # Exact captured payload from scripted-session.log
-    config_hex = (
-        "080112130802104e1d001d4525000000002800300012130803100f1d006005"
-        "452500000000280030001212080410001d000042250000000028003000"
-        "1212080510001d0000422500000000280030001212080610001d0000"
-        "4225000000002800300018000000001c0000"
-    )
-    config = bytes.fromhex(config_hex)
-    payload = (bytes([0x08, 0x02]) +
-               bytes([0x10]) + encode_varint(msg_id) +
-               bytes([0x22, len(config)]) + config)
-    return build_aa_packet(seq, 0x0E, 0x20, payload)
+    payload = b"".join((b"\x08\x02\x10", encode_varint(msg_id), _DISPLAY_CONFIG_TAIL))
+    return build_aa(seq, 0x0E, 0x20, payload)
 
 
 # =============================================================================
@@ -174,16 +120,14 @@ def build_display_settings_packet(seq, msg_id, widgets, statuses):
 
     # Status bar items
     settings.statusDisplayCount = len(statuses)
-    for s in statuses:
-        settings.statusDisplayOrder.append(s)
+    settings.statusDisplayOrder.extend(statuses)
 
     # Widget tiles
     settings.widgetDisplayCount = len(widgets)
-    for w in widgets:
-        settings.widgetDisplayOrder.append(w)
+    settings.widgetDisplayOrder.extend(widgets)
 
     payload = pkg.SerializeToString()
-    return build_aa_packet(seq, 0x01, 0x20, payload)
+    return build_aa(seq, 0x01, 0x20, payload)
 
 
 def build_weather_packet(seq, msg_id, temp_f, condition_code):
@@ -202,7 +146,7 @@ def build_weather_packet(seq, msg_id, temp_f, condition_code):
     weather.updateTime = int(time.time())
 
     payload = pkg.SerializeToString()
-    return build_aa_packet(seq, 0x01, 0x20, payload)
+    return build_aa(seq, 0x01, 0x20, payload)
 
 
 def build_schedule_packet(seq, msg_id, total, num, event):
@@ -225,7 +169,7 @@ def build_schedule_packet(seq, msg_id, total, num, event):
     s.endTimestamp = event.get('end_ts', 0)
 
     payload = pkg.SerializeToString()
-    return build_aa_packet(seq, 0x01, 0x20, payload)
+    return build_aa(seq, 0x01, 0x20, payload)
 
 
 def build_app_respond_packet(seq, msg_id, package_id):
@@ -239,7 +183,7 @@ def build_app_respond_packet(seq, msg_id, package_id):
     respond.flag = dashboard_pb2.APP_RECEIVED_SUCCESS
 
     payload = pkg.SerializeToString()
-    return build_aa_packet(seq, 0x01, 0x20, payload)
+    return build_aa(seq, 0x01, 0x20, payload)
 
 
 # =============================================================================
@@ -267,14 +211,22 @@ WEATHER_CODE_MAP = {
 }
 
 
+WEATHER_TTL = 600  # seconds
+
+
 def fetch_weather(location=""):
-    """Fetch current weather from wttr.in."""
+    """Fetch current weather from wttr.in (cached for WEATHER_TTL seconds)."""
     loc = location.replace(" ", "+") if location else ""
     url = f"https://wttr.in/{loc}?format=j1"
+    key = "weather-" + ("".join(c if c.isalnum() else "_" for c in location.strip().lower()) or "auto")
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "even-g2-dashboard"})
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
+        path = os.path.join(CACHE_DIR, f"{key}.json")
+        data = read_cache(path, WEATHER_TTL)
+        fresh = data is None
+        if fresh:
+            req = urllib.request.Request(url, headers={"User-Agent": "even-g2-dashboard"})
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                data = json.loads(resp.read())
 
         current = data["current_condition"][0]
         temp_f = float(current["temp_F"])
@@ -284,6 +236,10 @@ def fetch_weather(location=""):
         area = data.get("nearest_area", [{}])[0]
         city = area.get("areaName", [{}])[0].get("value", location or "Unknown")
 
+        # Only a response that parsed is cached
+        if fresh:
+            write_cache(path, data)
+
         print(f"  Weather: {city} - {temp_f}F, {desc}")
         return temp_f, condition, city
     except Exception as e:
@@ -292,18 +248,123 @@ def fetch_weather(location=""):
         return 72.0, dashboard_pb2.WEATHER_SUNNY, location or "Unknown"
 
 
+# =============================================================================
+# Device discovery
+# =============================================================================
+
+async def find_lenses():
+    """Return (device, right_lens), trying cached addresses before a full scan.
+
+    A cached address resolves as soon as the lens advertises, instead of
+    waiting out the whole discovery window.
+    """
+    cached = load_cached_lenses()
+    if cached.get("left"):
+        # One lookup at a time: some backends reject concurrent scans
+        device = await BleakScanner.find_device_by_address(cached["left"], timeout=3.0)
+        if device is not None:
+            right = None
+            if cached.get("right"):
+                right = await BleakScanner.find_device_by_address(cached["right"], timeout=3.0)
+            return device, right
+
+    # Full scan: stop as soon as both lenses have advertised
+    found = {}
+    both = asyncio.Event()
+
+    def on_adv(device, adv):
+        if not device.name or "G2" not in device.name:
+            return
+        side = "L" if "_L_" in device.name else "R" if "_R_" in device.name else None
+        found.setdefault(side, device)
+        if "L" in found and "R" in found:
+            both.set()
+
+    async with BleakScanner(detection_callback=on_adv):
+        try:
+            await asyncio.wait_for(both.wait(), 10.0)
+        except asyncio.TimeoutError:
+            pass
+    if not found:
+        return None, None
+    return found.get("L") or next(iter(found.values())), found.get("R")
+
+
+RIGHT_CONNECT_GRACE = 2.0  # seconds the left lens waits after auth
+
+
+async def connect_right(right):
+    """Connect the right lens for mirroring; None if it is unavailable."""
+    rclient = BleakClient(right)
+    try:
+        await rclient.connect()
+    except Exception as e:
+        print(f"  Right lens error: {e}")
+        return None
+    if not rclient.is_connected:
+        print("  Right lens connection failed")
+        return None
+    print("  Right lens connected!")
+    return rclient
+
+
+@contextlib.asynccontextmanager
+async def right_lens(right):
+    """Connect the right lens in the background; always closed on exit.
+
+    Yields the connect task (None without a right lens). On exit a pending
+    connect is cancelled and an established connection is disconnected.
+    """
+    task = asyncio.create_task(connect_right(right)) if right else None
+    try:
+        yield task
+    finally:
+        if task is not None:
+            task.cancel()
+            try:
+                rclient = await task
+            except asyncio.CancelledError:
+                rclient = None
+            if rclient is not None:
+                try:
+                    await rclient.disconnect()
+                except Exception as e:
+                    print(f"  Right lens error: {e}")
+
+
 # =============================================================================
 # Response handler
 # =============================================================================
 
+def _peek_command_id(buf):
+    """Read DashboardDataPackage.commandId (field 1) without a full parse.
+
+    Returns None when the payload does not start with that field.
+    """
+    if not buf or buf[0] != 0x08:
+        return None
+    value = 0
+    for i in range(1, min(len(buf), 6)):
+        byte = buf[i]
+        value |= (byte & 0x7F) << (7 * (i - 1))
+        if not byte & 0x80:
+            return value
+    return None
+
+
+_PARSED_COMMANDS = frozenset((dashboard_pb2.APP_RECEIVE, dashboard_pb2.Dashboard_Respond))
+
+
 class DashboardSession:
     def __init__(self):
-        self.responses = []
+        # Only recent responses are kept; response_count is the running total
+        self.responses = deque(maxlen=512)
+        self.response_count = 0
         self.display_packets = 0
-        self.glasses_requests = []
+        self.glasses_requests = deque()
+        self.wake = asyncio.Event()  # Set on every notification for the monitor loop
         self.seq = 0x08
         self.msg_id = 0x14
-        self.sent_packets = []  # Track all sent packets for right lens mirroring
 
     def next(self):
         """Get next seq/msg_id pair and increment."""
@@ -321,24 +382,31 @@ class DashboardSession:
 
             # Check if glasses are sending us a dashboard request
             if svc_hi == 0x01 and svc_lo == 0x20:
-                try:
-                    pkg = dashboard_pb2.DashboardDataPackage()
-                    pkg.ParseFromString(proto_data)
-                    if pkg.commandId == dashboard_pb2.APP_RECEIVE:
-                        print(f"  <- GLASSES REQUEST: packageId={pkg.appReceive.packageId} reset={pkg.appReceive.reset}")
-                        self.glasses_requests.append(pkg)
-                    elif pkg.commandId == dashboard_pb2.Dashboard_Respond:
-                        flag = "OK" if pkg.dashboardRespond.flag == 0 else "ERR"
-                        print(f"  <- Dashboard ACK: packageId={pkg.dashboardRespond.packageId} flag={flag}")
-                    else:
-                        print(f"  <- [{svc}] cmd={pkg.commandId}: {data.hex()[:60]}")
-                except Exception:
-                    print(f"  <- [{svc}] ({len(data)}b): {data.hex()[:60]}")
+                # Only the request/ACK commands need the decoded message
+                cmd = _peek_command_id(proto_data)
+                if cmd is not None and cmd not in _PARSED_COMMANDS:
+                    print(f"  <- [{svc}] cmd={cmd}: {data[:30].hex()}")
+                else:
+                    try:
+                        pkg = dashboard_pb2.DashboardDataPackage()
+                        pkg.ParseFromString(proto_data)
+                        if pkg.commandId == dashboard_pb2.APP_RECEIVE:
+                            print(f"  <- GLASSES REQUEST: packageId={pkg.appReceive.packageId} reset={pkg.appReceive.reset}")
+                            self.glasses_requests.append(pkg)
+                        elif pkg.commandId == dashboard_pb2.Dashboard_Respond:
+                            flag = "OK" if pkg.dashboardRespond.flag == 0 else "ERR"
+                            print(f"  <- Dashboard ACK: packageId={pkg.dashboardRespond.packageId} flag={flag}")
+                        else:
+                            print(f"  <- [{svc}] cmd={pkg.commandId}: {data[:30].hex()}")
+                    except Exception:
+                        print(f"  <- [{svc}] ({len(data)}b): {data[:30].hex()}")
             else:
-                print(f"  <- [{svc}] ({len(data)}b): {data.hex()[:60]}")
+                print(f"  <- [{svc}] ({len(data)}b): {data[:30].hex()}")
         else:
-            print(f"  <- raw ({len(data)}b): {data.hex()[:40]}")
+            print(f"  <- raw ({len(data)}b): {data[:20].hex()}")
         self.responses.append(bytes(data))
+        self.response_count += 1
+        self.wake.set()
 
     def on_display(self, sender, data):
         """Handle display rendering data on 0x6402."""
@@ -350,12 +418,11 @@ class DashboardSession:
 # =============================================================================
 
 async def run(args):
-    # Fetch weather data first
+    # Fetch weather in a worker thread so the HTTP request overlaps the scan
     print("Fetching live data...")
+    weather_task = None
     if not args.no_weather:
-        temp_f, weather_code, city = fetch_weather(args.location)
-    else:
-        temp_f, weather_code, city = 72.0, dashboard_pb2.WEATHER_SUNNY, "Default"
+        weather_task = asyncio.create_task(asyncio.to_thread(fetch_weather, args.location))
 
     # Parse schedule events
     events = []
@@ -383,26 +450,29 @@ async def run(args):
 
     # Connect
     print("\nScanning for Even G2 glasses...")
-    devices = await BleakScanner.discover(timeout=10.0)
-    g2_devices = [d for d in devices if d.name and "G2" in d.name]
-    if not g2_devices:
+    if weather_task is not None:
+        (device, right), (temp_f, weather_code, city) = await asyncio.gather(
+            find_lenses(), weather_task)
+    else:
+        device, right = await find_lenses()
+        temp_f, weather_code, city = 72.0, dashboard_pb2.WEATHER_SUNNY, "Default"
+    if device is None:
         print("No G2 glasses found!")
         return
 
-    left = next((d for d in g2_devices if "_L_" in d.name), None)
-    right = next((d for d in g2_devices if "_R_" in d.name), None)
-    device = left or g2_devices[0]
     print(f"Using: {device.name}")
     if right:
         print(f"Right lens: {right.name}")
 
     session = DashboardSession()
-
-    async with BleakClient(device) as client:
+    # The right lens connects alongside the left and gets every dashboard
+    # packet at the same time, instead of a replay after the left is done
+    async with right_lens(right) as right_task, BleakClient(device) as client:
         if not client.is_connected:
             print("Failed to connect!")
             return
         print("Connected!\n")
+        save_cached_lenses(device, right)
 
         await client.start_notify(CHAR_NOTIFY, session.on_notify)
         await client.start_notify(CHAR_DISPLAY_N, session.on_display)
@@ -411,16 +481,42 @@ async def run(args):
         print("Authenticating...")
         for pkt in build_auth_packets():
             await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-            await asyncio.sleep(0.1)
+            await asyncio.sleep(WRITE_GAP)
         await asyncio.sleep(0.5)
-        print(f"Auth complete ({len(session.responses)} responses)\n")
+        print(f"Auth complete ({session.response_count} responses)\n")
+
+        # Mirroring only makes sense from the start of the sequence, so the
+        # right lens gets a short grace period and is otherwise skipped
+        rclient = None
+        if right_task is not None:
+            await asyncio.wait({right_task}, timeout=RIGHT_CONNECT_GRACE)
+            if right_task.done():
+                rclient = right_task.result()
+            else:
+                print("  Right lens not connected yet, continuing with the left lens only")
+
+        async def mirror(pkt):
+            nonlocal rclient
+            try:
+                await rclient.write_gatt_char(CHAR_WRITE, pkt, response=False)
+            except Exception as e:
+                print(f"  Right lens error: {e}")
+                rclient = None
+
+        # One write-without-response per AA packet, WRITE_GAP apart; the
+        # phases below keep their own settle waits.
+        write_left = client.write_gatt_char
+        verbose = not args.quiet
 
         async def send(pkt, label=""):
-            if label:
-                print(f"  -> {label} ({len(pkt)}b): {pkt.hex()[:80]}")
-            await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-            session.sent_packets.append(pkt)
-            await asyncio.sleep(0.15)
+            if label and verbose:
+                print(f"  -> {label} ({len(pkt)}b): {pkt[:40].hex()}")
+            write = write_left(CHAR_WRITE, pkt, response=False)
+            if rclient is None:
+                await write
+            else:
+                await asyncio.gather(write, mirror(pkt))
+            await asyncio.sleep(WRITE_GAP)
 
         # =====================================================================
         # Phase 1: Activation sequence
@@ -496,51 +592,42 @@ async def run(args):
         seq, mid = session.next()
         await send(build_display_config(seq, mid), "Display Config (0x0E-20)")
 
-        # =====================================================================
-        # Mirror to right lens if available
-        # =====================================================================
-        if right:
-            print("\n" + "=" * 55)
-            print("MIRRORING TO RIGHT LENS")
-            print("=" * 55)
-            try:
-                async with BleakClient(right) as rclient:
-                    if rclient.is_connected:
-                        print("  Right lens connected!")
-                        # Replay all sent packets to right lens
-                        for pkt in session.sent_packets:
-                            await rclient.write_gatt_char(CHAR_WRITE, pkt, response=False)
-                            await asyncio.sleep(0.1)
-                        print(f"  Sent {len(session.sent_packets)} packets to right lens")
-                    else:
-                        print("  Right lens connection failed")
-            except Exception as e:
-                print(f"  Right lens error: {e}")
-
         # =====================================================================
         # Monitor for responses
         # =====================================================================
-        pre_count = len(session.responses)
+        pre_count = session.response_count
         print("\n" + "=" * 55)
         print("MONITORING (waiting for display...)")
         print("=" * 55)
 
-        for i in range(20):
-            await asyncio.sleep(1.0)
+        # Wake on each notification so glasses requests are answered right
+        # away; the progress line still ticks once a second for 20s.
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        elapsed = 0
+        while elapsed < 20:
+            try:
+                await asyncio.wait_for(session.wake.wait(), start + elapsed + 1 - loop.time())
+            except asyncio.TimeoutError:
+                pass
+            session.wake.clear()
 
             # Handle any glasses requests
             while session.glasses_requests:
-                req = session.glasses_requests.pop(0)
+                req = session.glasses_requests.popleft()
                 print(f"  Responding to glasses request (packageId={req.appReceive.packageId})")
                 seq, mid = session.next()
                 pkt = build_app_respond_packet(seq, mid, req.appReceive.packageId)
-                await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
+                await write_left(CHAR_WRITE, pkt, response=False)
 
-            new_resp = len(session.responses) - pre_count
-            if (i + 1) % 5 == 0 or new_resp > 0:
-                print(f"  [{i+1:2d}s] new_responses={new_resp} display={session.display_packets}")
+            if loop.time() - start < elapsed + 1:
+                continue
+            elapsed += 1
+            new_resp = session.response_count - pre_count
+            if elapsed % 5 == 0 or new_resp > 0:
+                print(f"  [{elapsed:2d}s] new_responses={new_resp} display={session.display_packets}")
 
-        total_new = len(session.responses) - pre_count
+        total_new = session.response_count - pre_count
         print(f"\nFinal: {total_new} new responses, {session.display_packets} display packets")
         if total_new == 0:
             print("No responses from dashboard commands.")
@@ -556,6 +643,8 @@ def main():
                         help="Skip weather fetch")
     parser.add_argument("--schedule", "-s", action="append",
                         help="Schedule event as 'Title|Time|Location' (repeatable)")
+    parser.add_argument("--quiet", "-q", action="store_true",
+                        help="Don't print each packet as it is sent")
     args = parser.parse_args()
     asyncio.run(run(args))
 
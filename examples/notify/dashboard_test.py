@@ -11,78 +11,16 @@ Samsung capture (64 writes) and the most likely path for notification text.
 """
 
 import asyncio
-import time
 from bleak import BleakClient, BleakScanner
 
+from g2proto import WRITE_GAP, build_aa, build_aa_framed, build_auth_packets, frame_payload, pb_bytes, pb_string, pb_varint
+
 UUID_BASE = "00002760-08c2-11e1-9073-0e8ac72e{:04x}"
 CHAR_WRITE = UUID_BASE.format(0x5401)
 CHAR_NOTIFY = UUID_BASE.format(0x5402)
 CHAR_DISPLAY_N = UUID_BASE.format(0x6402)
 
 
-def crc16_ccitt(data, init=0xFFFF):
-    crc = init
-    for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
-            crc &= 0xFFFF
-    return crc
-
-
-def add_crc(packet):
-    crc = crc16_ccitt(packet[8:])
-    return packet + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
-
-
-def encode_varint(value):
-    result = []
-    while value > 0x7F:
-        result.append((value & 0x7F) | 0x80)
-        value >>= 7
-    result.append(value & 0x7F)
-    return bytes(result)
-
-
-def build_aa(seq, svc_hi, svc_lo, payload):
-    header = bytes([0xAA, 0x21, seq, len(payload) + 2, 0x01, 0x01, svc_hi, svc_lo])
-    return add_crc(header + payload)
-
-
-def build_auth_packets():
-    timestamp = int(time.time())
-    ts = encode_varint(timestamp)
-    txid = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
-    p = []
-    p.append(add_crc(bytes([0xAA,0x21,0x01,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x0C,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x02,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x0E,0x22,0x02,0x08,0x02])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x0F,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x03,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    p.append(add_crc(bytes([0xAA,0x21,0x04,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x10,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x05,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x11,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x06,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x12,0x22,0x02,0x08,0x01])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x13,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x07,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    return p
-
-
-# ============================================================================
-# Protobuf helpers for building widget payloads
-# ============================================================================
-
-def pb_varint(field, value):
-    """Encode a protobuf varint field."""
-    return bytes([(field << 3) | 0]) + encode_varint(value)
-
-def pb_bytes(field, data):
-    """Encode a protobuf length-delimited field."""
-    return bytes([(field << 3) | 2]) + encode_varint(len(data)) + data
-
-def pb_string(field, text):
-    """Encode a protobuf string field."""
-    return pb_bytes(field, text.encode('utf-8'))
-
-
 # ============================================================================
 # Captured payloads from Samsung BLE traffic (exact bytes)
 # ============================================================================
@@ -129,23 +67,30 @@ WIDGET_CLEAR = bytes.fromhex(
     "0802101a220a1a081206120408001000"
 )
 
+# Captured payloads framed with their CRC once; build_aa_framed only adds
+# the header
+FRAMED = {payload: frame_payload(payload) for payload in (
+    WIDGET_CONFIG, CALENDAR_EVENT, MEETING_EVENT, NEW_YEARS_EVENT,
+    STOCK_WIDGET, DASHBOARD_REFRESH,
+)}
+
 
 def build_custom_calendar(msg_id, title, location, time_range, index=0):
     """Build a calendar widget with custom text, matching captured format."""
     # Innermost: the calendar data
-    cal_data = (
-        pb_string(2, title) +
-        pb_string(3, location) +
-        pb_string(4, time_range) +
-        pb_varint(5, 6)  # day_offset (6 = today?)
-    )
+    cal_data = b"".join((
+        pb_string(2, title),
+        pb_string(3, location),
+        pb_string(4, time_range),
+        pb_varint(5, 6),  # day_offset (6 = today?)
+    ))
     # Nest it: field 3 -> field 3 -> field 2 -> field 3 -> field 4
-    inner = pb_varint(1, 3) + pb_varint(2, index) + pb_bytes(3, cal_data)
+    inner = b"".join((pb_varint(1, 3), pb_varint(2, index), pb_bytes(3, cal_data)))
     level3 = pb_bytes(3, inner)
     level2 = pb_bytes(2, level3)
     level1 = pb_bytes(3, level2)
     container = pb_bytes(4, level1)
-    return pb_varint(1, 2) + pb_varint(2, msg_id) + container
+    return b"".join((pb_varint(1, 2), pb_varint(2, msg_id), container))
 
 
 class Tracker:
@@ -184,7 +129,7 @@ async def main():
         print("Authenticating...")
         for pkt in build_auth_packets():
             await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-            await asyncio.sleep(0.1)
+            await asyncio.sleep(WRITE_GAP)
         await asyncio.sleep(1.0)
         print(f"Auth done ({len(t.r)} responses)\n")
 
@@ -198,7 +143,7 @@ async def main():
         print("EXP 1: Widget configuration (service 0x01-20)")
         print("=" * 60)
         before = len(t.r)
-        pkt = build_aa(seq, 0x01, 0x20, WIDGET_CONFIG)
+        pkt = build_aa_framed(seq, 0x01, 0x20, FRAMED[WIDGET_CONFIG])
         print(f"  Sending ({len(pkt)}b): {pkt.hex()[:50]}...")
         await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
         seq += 1
@@ -212,7 +157,7 @@ async def main():
         print("EXP 2: Calendar event [CALENDAR_EVENT] (service 0x01-20)")
         print("=" * 60)
         before = len(t.r)
-        pkt = build_aa(seq, 0x01, 0x20, CALENDAR_EVENT)
+        pkt = build_aa_framed(seq, 0x01, 0x20, FRAMED[CALENDAR_EVENT])
         print(f"  Sending ({len(pkt)}b): {pkt.hex()[:50]}...")
         await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
         seq += 1
@@ -226,7 +171,7 @@ async def main():
         print("EXP 3: Meeting event [MEETING] (service 0x01-20)")
         print("=" * 60)
         before = len(t.r)
-        pkt = build_aa(seq, 0x01, 0x20, MEETING_EVENT)
+        pkt = build_aa_framed(seq, 0x01, 0x20, FRAMED[MEETING_EVENT])
         print(f"  Sending ({len(pkt)}b): {pkt.hex()[:50]}...")
         await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
         seq += 1
@@ -240,7 +185,7 @@ async def main():
         print("EXP 4: New Year's Day event (service 0x01-20)")
         print("=" * 60)
         before = len(t.r)
-        pkt = build_aa(seq, 0x01, 0x20, NEW_YEARS_EVENT)
+        pkt = build_aa_framed(seq, 0x01, 0x20, FRAMED[NEW_YEARS_EVENT])
         print(f"  Sending ({len(pkt)}b): {pkt.hex()[:50]}...")
         await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
         seq += 1
@@ -254,7 +199,7 @@ async def main():
         print("EXP 5: Dashboard refresh (service 0x07-20)")
         print("=" * 60)
         before = len(t.r)
-        pkt = build_aa(seq, 0x07, 0x20, DASHBOARD_REFRESH)
+        pkt = build_aa_framed(seq, 0x07, 0x20, FRAMED[DASHBOARD_REFRESH])
         print(f"  Sending ({len(pkt)}b): {pkt.hex()[:50]}...")
         await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
         seq += 1
@@ -268,7 +213,7 @@ async def main():
         print("EXP 6: Stock widget BTCE.XAMS (service 0x01-20)")
         print("=" * 60)
         before = len(t.r)
-        pkt = build_aa(seq, 0x01, 0x20, STOCK_WIDGET)
+        pkt = build_aa_framed(seq, 0x01, 0x20, FRAMED[STOCK_WIDGET])
         print(f"  Sending ({len(pkt)}b): {pkt.hex()[:50]}...")
         await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
         seq += 1
@@ -282,7 +227,7 @@ async def main():
         print("EXP 7: Dashboard refresh again (service 0x07-20)")
         print("=" * 60)
         before = len(t.r)
-        pkt = build_aa(seq, 0x07, 0x20, DASHBOARD_REFRESH)
+        pkt = build_aa_framed(seq, 0x07, 0x20, FRAMED[DASHBOARD_REFRESH])
         print(f"  Sending ({len(pkt)}b): {pkt.hex()[:50]}...")
         await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
         seq += 1
@@ -333,25 +278,25 @@ async def main():
         before = len(t.r)
 
         # Config
-        pkt = build_aa(seq, 0x01, 0x20, WIDGET_CONFIG)
+        pkt = build_aa_framed(seq, 0x01, 0x20, FRAMED[WIDGET_CONFIG])
         await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
         seq += 1
         await asyncio.sleep(0.3)
 
         # Calendar
-        pkt = build_aa(seq, 0x01, 0x20, CALENDAR_EVENT)
+        pkt = build_aa_framed(seq, 0x01, 0x20, FRAMED[CALENDAR_EVENT])
         await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
         seq += 1
         await asyncio.sleep(0.15)
 
         # Meeting
-        pkt = build_aa(seq, 0x01, 0x20, MEETING_EVENT)
+        pkt = build_aa_framed(seq, 0x01, 0x20, FRAMED[MEETING_EVENT])
         await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
         seq += 1
         await asyncio.sleep(0.15)
 
         # New Year's
-        pkt = build_aa(seq, 0x01, 0x20, NEW_YEARS_EVENT)
+        pkt = build_aa_framed(seq, 0x01, 0x20, FRAMED[NEW_YEARS_EVENT])
         await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
         seq += 1
         await asyncio.sleep(0.15)
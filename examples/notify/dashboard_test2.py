@@ -20,64 +20,16 @@ Capture sequence:
 """
 
 import asyncio
-import time
 from bleak import BleakClient, BleakScanner
 
+from g2proto import WRITE_GAP, build_aa_framed, build_auth_packets, frame_payload, pb_bytes, pb_string, pb_varint
+
 UUID_BASE = "00002760-08c2-11e1-9073-0e8ac72e{:04x}"
 CHAR_WRITE = UUID_BASE.format(0x5401)
 CHAR_NOTIFY = UUID_BASE.format(0x5402)
 CHAR_DISPLAY_N = UUID_BASE.format(0x6402)
 
 
-def crc16_ccitt(data, init=0xFFFF):
-    crc = init
-    for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
-            crc &= 0xFFFF
-    return crc
-
-def add_crc(packet):
-    crc = crc16_ccitt(packet[8:])
-    return packet + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
-
-def encode_varint(value):
-    result = []
-    while value > 0x7F:
-        result.append((value & 0x7F) | 0x80)
-        value >>= 7
-    result.append(value & 0x7F)
-    return bytes(result)
-
-def build_aa(seq, svc_hi, svc_lo, payload):
-    header = bytes([0xAA, 0x21, seq, len(payload) + 2, 0x01, 0x01, svc_hi, svc_lo])
-    return add_crc(header + payload)
-
-def pb_varint(field, value):
-    return bytes([(field << 3) | 0]) + encode_varint(value)
-def pb_bytes(field, data):
-    return bytes([(field << 3) | 2]) + encode_varint(len(data)) + data
-def pb_string(field, text):
-    return pb_bytes(field, text.encode('utf-8'))
-
-def build_auth_packets():
-    timestamp = int(time.time())
-    ts = encode_varint(timestamp)
-    txid = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
-    p = []
-    p.append(add_crc(bytes([0xAA,0x21,0x01,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x0C,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x02,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x0E,0x22,0x02,0x08,0x02])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x0F,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x03,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    p.append(add_crc(bytes([0xAA,0x21,0x04,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x10,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x05,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x11,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x06,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x12,0x22,0x02,0x08,0x01])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x13,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x07,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    return p
-
-
 # ============================================================================
 # Exact captured payloads
 # ============================================================================
@@ -137,6 +89,13 @@ WIDGET_CLEAR = bytes.fromhex("0802101e220a1a081206120408001000")
 # Display Wake (0x04-20) - 14 bytes
 DISPLAY_WAKE = bytes.fromhex("080110201a080801100118052801")
 
+# Captured payloads framed with their CRC once; send() only adds the header
+FRAMED = {payload: frame_payload(payload) for payload in (
+    DISPLAY_CONFIG, DASHBOARD_ENABLE, DASHBOARD_REFRESH, SCREEN_MODE,
+    WIDGET_CONFIG, CALENDAR_EVENT, WIDGET_INDEX, MEETING_EVENT,
+    NEW_YEARS_EVENT, WIDGET_CLEAR, DISPLAY_WAKE,
+)}
+
 
 class Tracker:
     def __init__(self):
@@ -155,10 +114,11 @@ class Tracker:
         return cb
 
 
-async def send(client, seq, svc_hi, svc_lo, payload, label=""):
-    pkt = build_aa(seq, svc_hi, svc_lo, payload)
+async def send(client, seq, svc_hi, svc_lo, framed, label=""):
+    """Write one packet; `framed` is a frame_payload() result."""
+    pkt = build_aa_framed(seq, svc_hi, svc_lo, framed)
     svc = f"0x{svc_hi:02X}-{svc_lo:02X}"
-    print(f"  -> [{svc}] seq=0x{seq:02X} ({len(payload)}b) {label}")
+    print(f"  -> [{svc}] seq=0x{seq:02X} ({len(framed) - 2}b) {label}")
     await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
 
 
@@ -181,7 +141,7 @@ async def main():
         print("Authenticating...")
         for pkt in build_auth_packets():
             await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-            await asyncio.sleep(0.1)
+            await asyncio.sleep(WRITE_GAP)
         await asyncio.sleep(1.0)
         print(f"Auth done ({len(t.r)} responses)\n")
 
@@ -198,61 +158,61 @@ async def main():
         before = len(t.r)
 
         # Step 1: Display Config (0x0E-20) × 2
-        await send(client, seq, 0x0E, 0x20, DISPLAY_CONFIG, "Display Config")
+        await send(client, seq, 0x0E, 0x20, FRAMED[DISPLAY_CONFIG], "Display Config")
         seq += 1
         await asyncio.sleep(0.3)
 
-        await send(client, seq, 0x0E, 0x20, DISPLAY_CONFIG, "Display Config (repeat)")
+        await send(client, seq, 0x0E, 0x20, FRAMED[DISPLAY_CONFIG], "Display Config (repeat)")
         seq += 1
         await asyncio.sleep(0.3)
 
         # Step 2: Dashboard Enable (0x0A-20)
-        await send(client, seq, 0x0A, 0x20, DASHBOARD_ENABLE, "Dashboard Enable")
+        await send(client, seq, 0x0A, 0x20, FRAMED[DASHBOARD_ENABLE], "Dashboard Enable")
         seq += 1
         await asyncio.sleep(0.3)
 
         # Step 3: Dashboard Refresh (0x07-20)
-        await send(client, seq, 0x07, 0x20, DASHBOARD_REFRESH, "Dashboard Refresh")
+        await send(client, seq, 0x07, 0x20, FRAMED[DASHBOARD_REFRESH], "Dashboard Refresh")
         seq += 1
         await asyncio.sleep(0.3)
 
         # Step 4: Screen Mode (0x10-20)
-        await send(client, seq, 0x10, 0x20, SCREEN_MODE, "Screen Mode")
+        await send(client, seq, 0x10, 0x20, FRAMED[SCREEN_MODE], "Screen Mode")
         seq += 1
         await asyncio.sleep(0.3)
 
         # Step 5: Widget Config (0x01-20)
-        await send(client, seq, 0x01, 0x20, WIDGET_CONFIG, "Widget Config")
+        await send(client, seq, 0x01, 0x20, FRAMED[WIDGET_CONFIG], "Widget Config")
         seq += 1
         await asyncio.sleep(0.3)
 
         # Step 6: Calendar Event
-        await send(client, seq, 0x01, 0x20, CALENDAR_EVENT, "[CALENDAR_EVENT]")
+        await send(client, seq, 0x01, 0x20, FRAMED[CALENDAR_EVENT], "[CALENDAR_EVENT]")
         seq += 1
         await asyncio.sleep(0.15)
 
         # Step 7: Widget Index
-        await send(client, seq, 0x01, 0x20, WIDGET_INDEX, "Widget Index")
+        await send(client, seq, 0x01, 0x20, FRAMED[WIDGET_INDEX], "Widget Index")
         seq += 1
         await asyncio.sleep(0.15)
 
         # Step 8: Meeting Event
-        await send(client, seq, 0x01, 0x20, MEETING_EVENT, "[MEETING]")
+        await send(client, seq, 0x01, 0x20, FRAMED[MEETING_EVENT], "[MEETING]")
         seq += 1
         await asyncio.sleep(0.15)
 
         # Step 9: New Year's Day
-        await send(client, seq, 0x01, 0x20, NEW_YEARS_EVENT, "New Year's Day")
+        await send(client, seq, 0x01, 0x20, FRAMED[NEW_YEARS_EVENT], "New Year's Day")
         seq += 1
         await asyncio.sleep(0.15)
 
         # Step 10: Widget Clear
-        await send(client, seq, 0x01, 0x20, WIDGET_CLEAR, "Widget Clear")
+        await send(client, seq, 0x01, 0x20, FRAMED[WIDGET_CLEAR], "Widget Clear")
         seq += 1
         await asyncio.sleep(0.3)
 
         # Step 11: Display Wake (0x04-20)
-        await send(client, seq, 0x04, 0x20, DISPLAY_WAKE, "Display Wake!")
+        await send(client, seq, 0x04, 0x20, FRAMED[DISPLAY_WAKE], "Display Wake!")
         seq += 1
         await asyncio.sleep(1.0)
 
@@ -287,31 +247,31 @@ async def main():
         event = pb_varint(1, 2) + pb_varint(2, msg_id) + pb_bytes(4, pb_bytes(3, pb_bytes(2, pb_bytes(3, cal_data))))
         msg_id += 1
 
-        await send(client, seq, 0x0E, 0x20, DISPLAY_CONFIG, "Display Config")
+        await send(client, seq, 0x0E, 0x20, FRAMED[DISPLAY_CONFIG], "Display Config")
         seq += 1
         await asyncio.sleep(0.3)
 
-        await send(client, seq, 0x0A, 0x20, DASHBOARD_ENABLE, "Dashboard Enable")
+        await send(client, seq, 0x0A, 0x20, FRAMED[DASHBOARD_ENABLE], "Dashboard Enable")
         seq += 1
         await asyncio.sleep(0.3)
 
-        await send(client, seq, 0x07, 0x20, DASHBOARD_REFRESH, "Dashboard Refresh")
+        await send(client, seq, 0x07, 0x20, FRAMED[DASHBOARD_REFRESH], "Dashboard Refresh")
         seq += 1
         await asyncio.sleep(0.3)
 
-        await send(client, seq, 0x10, 0x20, SCREEN_MODE, "Screen Mode")
+        await send(client, seq, 0x10, 0x20, FRAMED[SCREEN_MODE], "Screen Mode")
         seq += 1
         await asyncio.sleep(0.3)
 
-        await send(client, seq, 0x01, 0x20, WIDGET_CONFIG, "Widget Config")
+        await send(client, seq, 0x01, 0x20, FRAMED[WIDGET_CONFIG], "Widget Config")
         seq += 1
         await asyncio.sleep(0.3)
 
-        await send(client, seq, 0x01, 0x20, event, "Custom: Team Standup")
+        await send(client, seq, 0x01, 0x20, frame_payload(event), "Custom: Team Standup")
         seq += 1
         await asyncio.sleep(0.3)
 
-        await send(client, seq, 0x04, 0x20, DISPLAY_WAKE, "Display Wake!")
+        await send(client, seq, 0x04, 0x20, FRAMED[DISPLAY_WAKE], "Display Wake!")
         seq += 1
         await asyncio.sleep(1.0)
 
@@ -8,39 +8,18 @@ with out-of-sequence msg_ids.
 """
 
 import asyncio
-import time
+import struct
 from bleak import BleakClient, BleakScanner
 
+from g2proto import WRITE_GAP, build_aa, build_auth_packets, encode_varint
+
 UUID_BASE = "00002760-08c2-11e1-9073-0e8ac72e{:04x}"
 CHAR_WRITE = UUID_BASE.format(0x5401)
 CHAR_NOTIFY = UUID_BASE.format(0x5402)
 CHAR_DISPLAY_N = UUID_BASE.format(0x6402)
 
 
-def crc16_ccitt(data, init=0xFFFF):
-    crc = init
-    for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
-            crc &= 0xFFFF
-    return crc
-
-def add_crc(packet):
-    crc = crc16_ccitt(packet[8:])
-    return packet + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
-
-def encode_varint(value):
-    result = []
-    while value > 0x7F:
-        result.append((value & 0x7F) | 0x80)
-        value >>= 7
-    result.append(value & 0x7F)
-    return bytes(result)
-
-def build_aa(seq, svc_hi, svc_lo, payload):
-    header = bytes([0xAA, 0x21, seq, len(payload) + 2, 0x01, 0x01, svc_hi, svc_lo])
-    return add_crc(header + payload)
+_FLOAT32 = struct.Struct('<f')
 
 def pb_varint(field, value):
     return bytes([(field << 3) | 0]) + encode_varint(value)
@@ -49,43 +28,30 @@ def pb_bytes(field, data):
 def pb_string(field, text):
     return pb_bytes(field, text.encode('utf-8'))
 def pb_fixed32(field, value):
-    import struct
-    return bytes([(field << 3) | 5]) + struct.pack('<f', value)
-
-def build_auth_packets():
-    timestamp = int(time.time())
-    ts = encode_varint(timestamp)
-    txid = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
-    p = []
-    p.append(add_crc(bytes([0xAA,0x21,0x01,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x0C,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x02,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x0E,0x22,0x02,0x08,0x02])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x0F,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x03,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    p.append(add_crc(bytes([0xAA,0x21,0x04,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x10,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x05,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x11,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x06,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x12,0x22,0x02,0x08,0x01])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x13,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x07,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    return p
+    return bytes([(field << 3) | 5]) + _FLOAT32.pack(value)
 
 
 # ============================================================================
 # Payload builders with dynamic msg_id
 # ============================================================================
 
+# Display settings with 5 regions (exact values from capture); only the
+# msg_id around them changes, so they are encoded once
+_DISPLAY_SETTINGS = (
+    pb_varint(1, 1) +
+    pb_bytes(2, pb_varint(1, 2) + pb_varint(2, 0x4E) + pb_fixed32(3, 2628.0) + pb_fixed32(4, 0.0) + pb_varint(5, 0) + pb_varint(6, 0)) +
+    pb_bytes(2, pb_varint(1, 3) + pb_varint(2, 0x0F) + pb_fixed32(3, 2832.0) + pb_fixed32(4, 0.0) + pb_varint(5, 0) + pb_varint(6, 0)) +
+    pb_bytes(2, pb_varint(1, 4) + pb_varint(2, 0) + pb_fixed32(3, 2624.0) + pb_fixed32(4, 0.0) + pb_varint(5, 0) + pb_varint(6, 0)) +
+    pb_bytes(2, pb_varint(1, 5) + pb_varint(2, 0) + pb_fixed32(3, 2624.0) + pb_fixed32(4, 0.0) + pb_varint(5, 0) + pb_varint(6, 0)) +
+    pb_bytes(2, pb_varint(1, 6) + pb_varint(2, 0) + pb_fixed32(3, 2624.0) + pb_fixed32(4, 0.0) + pb_varint(5, 0) + pb_varint(6, 0)) +
+    pb_varint(3, 0)
+)
+
+
 def build_display_config(msg_id):
     """Display Config (0x0E-20) - sets up display regions.
     Decoded from capture: type=2, msg_id, field 4 = display settings with 5 regions."""
-    # Display settings with 5 regions (exact values from capture)
-    regions = (
-        pb_bytes(2, pb_varint(1, 2) + pb_varint(2, 0x4E) + pb_fixed32(3, 2628.0) + pb_fixed32(4, 0.0) + pb_varint(5, 0) + pb_varint(6, 0)) +
-        pb_bytes(2, pb_varint(1, 3) + pb_varint(2, 0x0F) + pb_fixed32(3, 2832.0) + pb_fixed32(4, 0.0) + pb_varint(5, 0) + pb_varint(6, 0)) +
-        pb_bytes(2, pb_varint(1, 4) + pb_varint(2, 0) + pb_fixed32(3, 2624.0) + pb_fixed32(4, 0.0) + pb_varint(5, 0) + pb_varint(6, 0)) +
-        pb_bytes(2, pb_varint(1, 5) + pb_varint(2, 0) + pb_fixed32(3, 2624.0) + pb_fixed32(4, 0.0) + pb_varint(5, 0) + pb_varint(6, 0)) +
-        pb_bytes(2, pb_varint(1, 6) + pb_varint(2, 0) + pb_fixed32(3, 2624.0) + pb_fixed32(4, 0.0) + pb_varint(5, 0) + pb_varint(6, 0))
-    )
-    settings = pb_varint(1, 1) + regions + pb_varint(3, 0)
-    return pb_varint(1, 2) + pb_varint(2, msg_id) + pb_bytes(4, settings)
+    return pb_varint(1, 2) + pb_varint(2, msg_id) + pb_bytes(4, _DISPLAY_SETTINGS)
 
 
 def build_dashboard_enable(msg_id):
@@ -103,15 +69,16 @@ def build_screen_mode(msg_id):
     return pb_varint(1, 1) + pb_varint(2, msg_id) + pb_bytes(3, pb_varint(1, 4))
 
 
+# Inner config: field 1=4, field 2=3, field 3={1,2,3}, field 4=4, field 5={1,3,2,2}
+_WIDGET_CONFIG = pb_bytes(2, pb_bytes(2, pb_varint(1, 4) + pb_varint(2, 3) +
+                                         pb_bytes(3, bytes([0x01, 0x02, 0x03])) +
+                                         pb_varint(4, 4) +
+                                         pb_bytes(5, bytes([0x01, 0x03, 0x02, 0x02]))))
+
+
 def build_widget_config(msg_id):
     """Widget Config (0x01-20) - type=2, configures which widgets to show."""
-    # Inner config: field 1=4, field 2=3, field 3={1,2,3}, field 4=4, field 5={1,3,2,2}
-    inner = (pb_varint(1, 4) + pb_varint(2, 3) +
-             pb_bytes(3, bytes([0x01, 0x02, 0x03])) +
-             pb_varint(4, 4) +
-             pb_bytes(5, bytes([0x01, 0x03, 0x02, 0x02])))
-    config = pb_bytes(2, pb_bytes(2, inner))
-    return pb_varint(1, 2) + pb_varint(2, msg_id) + pb_bytes(4, config)
+    return pb_varint(1, 2) + pb_varint(2, msg_id) + pb_bytes(4, _WIDGET_CONFIG)
 
 
 def build_calendar_event(msg_id, index, title, location, time_range, day_offset=6):
@@ -143,7 +110,7 @@ class Tracker:
             svc = ""
             if len(data) >= 8 and data[0] == 0xAA:
                 svc = f" svc=0x{data[6]:02X}-{data[7]:02X}"
-            print(f"  <- [{label}] ({len(data)}b){svc}: {data.hex()[:60]}")
+            print(f"  <- [{label}] ({len(data)}b){svc}: {data[:30].hex()}")
             self.r.append((label, bytes(data)))
         return cb
 
@@ -153,6 +120,7 @@ async def send(client, seq, svc_hi, svc_lo, payload, label=""):
     svc = f"0x{svc_hi:02X}-{svc_lo:02X}"
     print(f"  -> [{svc}] seq=0x{seq:02X} msg_id in payload ({len(payload)}b) {label}")
     await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
+    await asyncio.sleep(WRITE_GAP)
 
 
 async def main():
@@ -174,7 +142,7 @@ async def main():
         print("Authenticating...")
         for pkt in build_auth_packets():
             await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-            await asyncio.sleep(0.1)
+            await asyncio.sleep(WRITE_GAP)
         await asyncio.sleep(1.0)
         print(f"Auth done ({len(t.r)} responses)\n")
 
@@ -192,36 +160,30 @@ async def main():
         payload = build_display_config(msg_id)
         await send(client, seq, 0x0E, 0x20, payload, "Display Config")
         seq += 1; msg_id += 1
-        await asyncio.sleep(0.3)
 
         payload = build_display_config(msg_id)
         await send(client, seq, 0x0E, 0x20, payload, "Display Config (2)")
         seq += 1; msg_id += 1
-        await asyncio.sleep(0.3)
 
         # 2. Dashboard Enable
         payload = build_dashboard_enable(msg_id)
         await send(client, seq, 0x0A, 0x20, payload, "Dashboard Enable")
         seq += 1; msg_id += 1
-        await asyncio.sleep(0.3)
 
         # 3. Dashboard Refresh
         payload = build_dashboard_refresh(msg_id)
         await send(client, seq, 0x07, 0x20, payload, "Dashboard Refresh")
         seq += 1; msg_id += 1
-        await asyncio.sleep(0.3)
 
         # 4. Screen Mode
         payload = build_screen_mode(msg_id)
         await send(client, seq, 0x10, 0x20, payload, "Screen Mode")
         seq += 1; msg_id += 1
-        await asyncio.sleep(0.3)
 
         # 5. Widget Config
         payload = build_widget_config(msg_id)
         await send(client, seq, 0x01, 0x20, payload, "Widget Config")
         seq += 1; msg_id += 1
-        await asyncio.sleep(0.3)
 
         # 6. Calendar Events
         for i, (title, loc, time_r) in enumerate([
@@ -232,7 +194,10 @@ async def main():
             payload = build_calendar_event(msg_id, i, title, loc, time_r)
             await send(client, seq, 0x01, 0x20, payload, f"Event: {title}")
             seq += 1; msg_id += 1
-            await asyncio.sleep(0.15)
+
+        # Steps 1-6 go out WRITE_GAP apart, in seq order; one settle lets the
+        # config land before the stateful DisplayWake transition.
+        await asyncio.sleep(0.3)
 
         # 7. Display Wake
         payload = build_display_wake(msg_id)
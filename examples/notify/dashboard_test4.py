@@ -8,62 +8,20 @@ running sequence.
 """
 
 import asyncio
-import time
 from bleak import BleakClient, BleakScanner
 
+from g2proto import WRITE_GAP, build_aa, build_auth_packets, encode_varint
+
 UUID_BASE = "00002760-08c2-11e1-9073-0e8ac72e{:04x}"
 CHAR_WRITE = UUID_BASE.format(0x5401)
 CHAR_NOTIFY = UUID_BASE.format(0x5402)
 CHAR_DISPLAY_N = UUID_BASE.format(0x6402)
 
 
-def crc16_ccitt(data, init=0xFFFF):
-    crc = init
-    for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
-            crc &= 0xFFFF
-    return crc
-
-def add_crc(packet):
-    crc = crc16_ccitt(packet[8:])
-    return packet + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
-
-def encode_varint(value):
-    result = []
-    while value > 0x7F:
-        result.append((value & 0x7F) | 0x80)
-        value >>= 7
-    result.append(value & 0x7F)
-    return bytes(result)
-
-def build_aa(seq, svc_hi, svc_lo, payload):
-    header = bytes([0xAA, 0x21, seq, len(payload) + 2, 0x01, 0x01, svc_hi, svc_lo])
-    return add_crc(header + payload)
-
-def build_auth_packets():
-    timestamp = int(time.time())
-    ts = encode_varint(timestamp)
-    txid = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
-    p = []
-    p.append(add_crc(bytes([0xAA,0x21,0x01,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x0C,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x02,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x0E,0x22,0x02,0x08,0x02])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x0F,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x03,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    p.append(add_crc(bytes([0xAA,0x21,0x04,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x10,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x05,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x11,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x06,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x12,0x22,0x02,0x08,0x01])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x13,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x07,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    return p
-
-
-def patch_msg_id(payload_hex, new_msg_id):
+def patch_msg_id(data, new_msg_id):
     """Replace the msg_id in a captured payload.
     Payloads start with: 08 XX 10 YY where YY is the msg_id.
     We replace the byte(s) after 0x10 with the new msg_id varint."""
-    data = bytes.fromhex(payload_hex)
     # Find field 2 tag (0x10) - it's the msg_id
     idx = data.index(0x10, 1)  # skip first byte (field 1 tag)
     # Read old varint length
@@ -77,7 +35,7 @@ def patch_msg_id(payload_hex, new_msg_id):
 
 
 # Exact captured payloads (hex strings)
-PAYLOADS = [
+_RAW_PAYLOADS = [
     # (service_hi, service_lo, hex_payload, label)
     (0x0E, 0x20,
      "08021010226a080112130802104e1d001d4525000000002800300012130803100f1d006005452500000000280030001212080410001d0000422500000000280030001212080510001d0000422500000000280030001212080610001d00004225000000002800300018000000000000001c0000",
@@ -122,6 +80,20 @@ PAYLOADS = [
      "DISPLAY WAKE"),
 ]
 
+# Decoded once at load, so patch_msg_id works on raw bytes
+PAYLOADS = [(svc_hi, svc_lo, bytes.fromhex(payload_hex), label)
+            for svc_hi, svc_lo, payload_hex, label in _RAW_PAYLOADS]
+
+# The sequence always starts at seq 0x08 / msg_id 0x14 and steps both by one
+# per payload, so every packet is fixed and built once at import
+FIRST_SEQ = 0x08
+FIRST_MSG_ID = 0x14
+PACKETS = [
+    (svc_hi, svc_lo, build_aa(FIRST_SEQ + i, svc_hi, svc_lo,
+                              patch_msg_id(payload, FIRST_MSG_ID + i)), label)
+    for i, (svc_hi, svc_lo, payload, label) in enumerate(PAYLOADS)
+]
+
 
 class Tracker:
     def __init__(self):
@@ -135,7 +107,7 @@ class Tracker:
             svc = ""
             if len(data) >= 8 and data[0] == 0xAA:
                 svc = f" svc=0x{data[6]:02X}-{data[7]:02X}"
-            print(f"  <- [{label}] ({len(data)}b){svc}: {data.hex()[:60]}")
+            print(f"  <- [{label}] ({len(data)}b){svc}: {data[:30].hex()}")
             self.r.append((label, bytes(data)))
         return cb
 
@@ -159,27 +131,29 @@ async def main():
         print("Authenticating...")
         for pkt in build_auth_packets():
             await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-            await asyncio.sleep(0.1)
+            await asyncio.sleep(WRITE_GAP)
         await asyncio.sleep(1.0)
         print(f"Auth done ({len(t.r)} responses)\n")
 
-        seq = 0x08
-        msg_id = 0x14
+        seq = FIRST_SEQ
+        msg_id = FIRST_MSG_ID
 
         print("=" * 60)
         print("EXACT CAPTURED SEQUENCE (patched msg_ids)")
         print("=" * 60)
         t.display_count = 0
 
-        for svc_hi, svc_lo, payload_hex, label in PAYLOADS:
-            payload = patch_msg_id(payload_hex, msg_id)
-            pkt = build_aa(seq, svc_hi, svc_lo, payload)
+        # Written WRITE_GAP apart, in seq order; only the stateful DisplayWake
+        # transition waits for the preceding config to settle.
+        for svc_hi, svc_lo, pkt, label in PACKETS:
+            if label == "DISPLAY WAKE":
+                await asyncio.sleep(0.3)
             svc = f"0x{svc_hi:02X}-{svc_lo:02X}"
-            print(f"  -> [{svc}] seq=0x{seq:02X} mid={msg_id} ({len(payload)}b) {label}")
+            print(f"  -> [{svc}] seq=0x{seq:02X} mid={msg_id} ({len(pkt) - 10}b) {label}")
             await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
+            await asyncio.sleep(WRITE_GAP)
             seq += 1
             msg_id += 1
-            await asyncio.sleep(0.2)
 
         print(f"\n  Immediate: 5402={len(t.r)-5}, 6402={t.display_count}")
 
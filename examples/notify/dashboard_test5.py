@@ -12,68 +12,18 @@ Key differences from v4:
 """
 
 import asyncio
-import time
 from bleak import BleakClient, BleakScanner
 
+from g2proto import WRITE_GAP, build_aa, build_auth_packets, encode_varint
+
 UUID_BASE = "00002760-08c2-11e1-9073-0e8ac72e{:04x}"
 CHAR_WRITE = UUID_BASE.format(0x5401)
 CHAR_NOTIFY = UUID_BASE.format(0x5402)
 CHAR_DISPLAY_N = UUID_BASE.format(0x6402)
 
 
-def crc16_ccitt(data, init=0xFFFF):
-    crc = init
-    for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
-            crc &= 0xFFFF
-    return crc
-
-
-def add_crc(packet):
-    crc = crc16_ccitt(packet[8:])
-    return packet + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
-
-
-def encode_varint(value):
-    result = []
-    while value > 0x7F:
-        result.append((value & 0x7F) | 0x80)
-        value >>= 7
-    result.append(value & 0x7F)
-    return bytes(result)
-
-
-def build_aa(seq, svc_hi, svc_lo, payload):
-    header = bytes([0xAA, 0x21, seq, len(payload) + 2, 0x01, 0x01, svc_hi, svc_lo])
-    return add_crc(header + payload)
-
-
-def build_auth_packets():
-    timestamp = int(time.time())
-    ts = encode_varint(timestamp)
-    txid = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
-    p = []
-    p.append(add_crc(bytes([0xAA,0x21,0x01,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x0C,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x02,0x0A,0x01,0x01,0x80,0x20,
-        0x08,0x05,0x10,0x0E,0x22,0x02,0x08,0x02])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x0F,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x03,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    p.append(add_crc(bytes([0xAA,0x21,0x04,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x10,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x05,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x11,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x06,0x0A,0x01,0x01,0x80,0x20,
-        0x08,0x05,0x10,0x12,0x22,0x02,0x08,0x01])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x13,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x07,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    return p
-
-
-def patch_msg_id(payload_hex, new_msg_id):
-    """Replace msg_id (field 2) in a captured payload."""
+def split_msg_id(payload_hex):
+    """Split a captured payload around its msg_id (field 2) varint."""
     data = bytes.fromhex(payload_hex)
     idx = data.index(0x10, 1)  # Find field 2 tag after field 1
     old_start = idx + 1
@@ -81,8 +31,13 @@ def patch_msg_id(payload_hex, new_msg_id):
     while data[old_end] & 0x80:
         old_end += 1
     old_end += 1
-    new_varint = encode_varint(new_msg_id)
-    return data[:old_start] + new_varint + data[old_end:]
+    return data[:old_start], data[old_end:]
+
+
+def patch_msg_id(parts, new_msg_id):
+    """Replace msg_id (field 2) in a captured payload split by split_msg_id."""
+    head, tail = parts
+    return b"".join((head, encode_varint(new_msg_id), tail))
 
 
 # EXACT captured payloads in CORRECT ORDER (from capture analysis)
@@ -140,6 +95,10 @@ DISPLAY_CONFIG = (0x0E, 0x20,
     "08021033226a080112130802104e1d001d4525000000002800300012130803100f1d006005452500000000280030001212080410001d0000422500000000280030001212080510001d0000422500000000280030001212080610001d00004225000000002800300018000000001c0000",
     "Display Config (post-dashboard)")
 
+# Captures are decoded and split once; sending only splices in the msg_id
+_SEQUENCE_PARTS = [split_msg_id(payload_hex) for _, _, payload_hex, _ in DASHBOARD_SEQUENCE]
+_DISPLAY_CONFIG_PARTS = split_msg_id(DISPLAY_CONFIG[2])
+
 
 class Tracker:
     def __init__(self):
@@ -178,7 +137,7 @@ async def main():
         print("Authenticating...")
         for pkt in build_auth_packets():
             await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-            await asyncio.sleep(0.1)
+            await asyncio.sleep(WRITE_GAP)
         await asyncio.sleep(1.0)
         auth_responses = len(t.responses)
         print(f"Auth done ({auth_responses} responses)\n")
@@ -191,8 +150,8 @@ async def main():
         print("=" * 60)
         t.display_count = 0
 
-        for svc_hi, svc_lo, payload_hex, label in DASHBOARD_SEQUENCE:
-            payload = patch_msg_id(payload_hex, msg_id)
+        for (svc_hi, svc_lo, _, label), parts in zip(DASHBOARD_SEQUENCE, _SEQUENCE_PARTS):
+            payload = patch_msg_id(parts, msg_id)
             pkt = build_aa(seq, svc_hi, svc_lo, payload)
             svc = f"0x{svc_hi:02X}-{svc_lo:02X}"
             print(f"  -> [{svc}] seq=0x{seq:02X} mid={msg_id} ({len(payload)}b) {label}")
@@ -215,8 +174,8 @@ async def main():
         print("\n" + "=" * 60)
         print("SENDING DISPLAY CONFIG (post-dashboard, matching capture)")
         print("=" * 60)
-        svc_hi, svc_lo, payload_hex, label = DISPLAY_CONFIG
-        payload = patch_msg_id(payload_hex, msg_id)
+        svc_hi, svc_lo, _, label = DISPLAY_CONFIG
+        payload = patch_msg_id(_DISPLAY_CONFIG_PARTS, msg_id)
         pkt = build_aa(seq, svc_hi, svc_lo, payload)
         print(f"  -> [0x{svc_hi:02X}-{svc_lo:02X}] seq=0x{seq:02X} mid={msg_id} ({len(payload)}b) {label}")
         await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
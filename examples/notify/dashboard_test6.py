@@ -20,11 +20,12 @@ This test replicates the EXACT captured initialization sequence:
 
 import asyncio
 import sys
-import time
 import os
 
 from bleak import BleakClient, BleakScanner
 
+from g2proto import WRITE_GAP, build_aa, build_auth_packets, encode_varint
+
 # Add protobuf path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "tools", "pbgenerated", "g2"))
 
@@ -43,78 +44,6 @@ CHAR_NOTIFY = UUID_BASE.format(0x5402)
 CHAR_DISPLAY_N = UUID_BASE.format(0x6402)
 
 
-# =============================================================================
-# Transport layer
-# =============================================================================
-
-def crc16_ccitt(data, init=0xFFFF):
-    crc = init
-    for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
-            crc &= 0xFFFF
-    return crc
-
-
-def add_crc(packet):
-    crc = crc16_ccitt(packet[8:])
-    return packet + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
-
-
-def encode_varint(value):
-    result = []
-    while value > 0x7F:
-        result.append((value & 0x7F) | 0x80)
-        value >>= 7
-    result.append(value & 0x7F)
-    return bytes(result)
-
-
-def build_aa(seq, service_id, status, payload):
-    """Build an AA-header packet.
-
-    Args:
-        seq: Sequence number
-        service_id: Single-byte service ID (e.g. 0x01 for dashboard)
-        status: Status byte (0x20 = reserveFlag=True, 0x00 = plain)
-        payload: Protobuf payload bytes
-    """
-    header = bytes([
-        0xAA,           # Magic
-        0x21,           # src=1, dst=2 (app→glasses)
-        seq & 0xFF,     # Sequence
-        len(payload) + 2,  # Payload length + CRC
-        0x01,           # packetTotalNum
-        0x01,           # packetSerialNum
-        service_id,     # Service ID
-        status,         # Status byte
-    ])
-    return add_crc(header + payload)
-
-
-def build_auth_packets():
-    timestamp = int(time.time())
-    ts = encode_varint(timestamp)
-    txid = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
-    p = []
-    p.append(add_crc(bytes([0xAA,0x21,0x01,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x0C,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x02,0x0A,0x01,0x01,0x80,0x20,
-        0x08,0x05,0x10,0x0E,0x22,0x02,0x08,0x02])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x0F,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x03,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    p.append(add_crc(bytes([0xAA,0x21,0x04,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x10,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x05,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x11,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x06,0x0A,0x01,0x01,0x80,0x20,
-        0x08,0x05,0x10,0x12,0x22,0x02,0x08,0x01])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x13,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x07,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    return p
-
-
 # =============================================================================
 # Protobuf message builders
 # =============================================================================
@@ -130,25 +59,19 @@ class MagicCounter:
         return v
 
 
+# Fields 1-15 with a value under 0x80 (magic, enums, flags) encode to two
+# fixed bytes, so those are built once and indexed by (field << 7) | value
+_PB_VARINT_SMALL = tuple(bytes([(i >> 7) << 3, i & 0x7F]) for i in range(16 << 7))
+
+
 def pb_varint(field, value):
-    tag = bytes([(field << 3) | 0])
-    result = []
-    while value > 0x7F:
-        result.append((value & 0x7F) | 0x80)
-        value >>= 7
-    result.append(value & 0x7F)
-    return tag + bytes(result)
+    if field < 16 and value < 0x80:
+        return _PB_VARINT_SMALL[(field << 7) | value]
+    return bytes([(field << 3) | 0]) + encode_varint(value)
 
 
 def pb_bytes(field, data):
-    tag = bytes([(field << 3) | 2])
-    result = []
-    ln = len(data)
-    while ln > 0x7F:
-        result.append((ln & 0x7F) | 0x80)
-        ln >>= 7
-    result.append(ln & 0x7F)
-    return tag + bytes(result) + data
+    return b"".join((bytes([(field << 3) | 2]), encode_varint(len(data)), data))
 
 
 def build_transcribe_init(magic):
@@ -298,6 +221,7 @@ async def send(client, seq, service_id, status, payload, label):
     print(f"  -> [0x{service_id:02X}] seq=0x{seq:02X} ({len(payload)}b) {label}")
     print(f"     payload: {payload.hex()[:80]}")
     await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
+    await asyncio.sleep(WRITE_GAP)
     return seq + 1
 
 
@@ -322,7 +246,7 @@ async def main():
         print("=" * 60)
         for pkt in build_auth_packets():
             await client.write_gatt_char(CHAR_WRITE, pkt, response=False)
-            await asyncio.sleep(0.1)
+            await asyncio.sleep(WRITE_GAP)
         await asyncio.sleep(1.0)
         auth_responses = len(t.responses)
         print(f"Auth done ({auth_responses} responses)\n")
@@ -339,7 +263,6 @@ async def main():
         seq = await send(client, seq, 0x0A, 0x20,
                         build_transcribe_init(magic.next()),
                         "Transcribe init")
-        await asyncio.sleep(0.15)
 
         # Skip magic 21 (gap in capture)
         magic.next()
@@ -348,16 +271,15 @@ async def main():
         seq = await send(client, seq, 0x07, 0x20,
                         build_evenai_config(magic.next()),
                         "EvenAI CONFIG (streamSpeed=32)")
-        await asyncio.sleep(0.15)
 
         # Onboarding FINISH
         seq = await send(client, seq, 0x10, 0x20,
                         build_onboarding_finish(magic.next()),
                         "Onboarding FINISH")
-        await asyncio.sleep(0.15)
 
         # Skip magic 24 (gap in capture)
         magic.next()
+        await asyncio.sleep(0.3)
 
         init_responses = len(t.responses) - auth_responses
         print(f"\nInit done ({init_responses} new responses)\n")
@@ -371,13 +293,11 @@ async def main():
         seq = await send(client, seq, 0x01, 0x20,
                         build_dashboard_display_settings(magic.next()),
                         "Dashboard display settings")
-        await asyncio.sleep(0.15)
 
         # Stock init (empty)
         seq = await send(client, seq, 0x01, 0x20,
                         build_dashboard_stock_init(magic.next()),
                         "Stock widget init (empty)")
-        await asyncio.sleep(0.15)
 
         # Calendar events
         events = [
@@ -389,7 +309,7 @@ async def main():
             seq = await send(client, seq, 0x01, 0x20,
                             build_dashboard_schedule(magic.next(), i, title, loc, time_str),
                             f"Calendar: {title}")
-            await asyncio.sleep(0.15)
+        await asyncio.sleep(0.3)
 
         dash_responses = len(t.responses) - auth_responses - init_responses
         print(f"\nDashboard data done ({dash_responses} new responses)\n")
@@ -403,25 +323,22 @@ async def main():
         seq = await send(client, seq, 0x04, 0x20,
                         build_notification_ctrl(magic.next()),
                         "Notification control (enable)")
-        await asyncio.sleep(0.15)
 
         # Settings request
         seq = await send(client, seq, 0x09, 0x20,
                         build_settings_request(magic.next()),
                         "Settings request (basic)")
-        await asyncio.sleep(0.15)
 
         # Module configure - language
         seq = await send(client, seq, 0x20, 0x20,
                         build_module_configure_language(magic.next()),
                         "ModuleConfigure: language=0")
-        await asyncio.sleep(0.15)
 
         # Module configure - dashboard auto-close
         seq = await send(client, seq, 0x20, 0x20,
                         build_module_configure_dashboard_autoclose(magic.next()),
                         "ModuleConfigure: dashboard auto-close")
-        await asyncio.sleep(0.15)
+        await asyncio.sleep(0.3)
 
         post_responses = len(t.responses) - auth_responses - init_responses - dash_responses
         print(f"\nPost-dashboard done ({post_responses} new responses)\n")
@@ -0,0 +1,211 @@
+"""
+Shared helpers for the notify examples: AA packets, protobuf fields,
+the JSON cache (weather, lens addresses) and scanning for the glasses.
+
+Packet format: [AA 21 seq len 01 01 svc_hi svc_lo payload crc_lo crc_hi]
+where len = payload + 2 and the CRC-16/CCITT covers only the payload.
+"""
+
+import asyncio
+import binascii
+import json
+import os
+import struct
+import time
+
+from bleak import BleakScanner
+
+
+def crc16_ccitt(data, init=0xFFFF):
+    # binascii.crc_hqx is CRC-16/CCITT (poly 0x1021, no reflection) in C
+    return binascii.crc_hqx(data, init)
+
+
+def add_crc(packet):
+    crc = crc16_ccitt(memoryview(packet)[8:])
+    return packet + crc.to_bytes(2, "little")
+
+
+_VARINT_1BYTE = tuple(bytes([i]) for i in range(0x80))
+
+
+def encode_varint(value):
+    # Unrolled by size: seq/msg_id/lengths need at most four bytes
+    if value < 0x80:
+        return _VARINT_1BYTE[value]
+    if value < 0x4000:
+        return bytes(((value & 0x7F) | 0x80, value >> 7))
+    if value < 0x200000:
+        return bytes(((value & 0x7F) | 0x80, ((value >> 7) & 0x7F) | 0x80,
+                      value >> 14))
+    if value < 0x10000000:
+        return bytes(((value & 0x7F) | 0x80, ((value >> 7) & 0x7F) | 0x80,
+                      ((value >> 14) & 0x7F) | 0x80, value >> 21))
+    result = []
+    while value > 0x7F:
+        result.append((value & 0x7F) | 0x80)
+        value >>= 7
+    result.append(value & 0x7F)
+    return bytes(result)
+
+
+_AA_HEADER = struct.Struct("8B")
+
+
+def build_aa(seq, svc_hi, svc_lo, payload):
+    header = _AA_HEADER.pack(0xAA, 0x21, seq & 0xFF, len(payload) + 2, 0x01, 0x01, svc_hi, svc_lo)
+    # The CRC covers only the payload, so it is taken straight from it
+    return header + payload + crc16_ccitt(payload).to_bytes(2, "little")
+
+
+def frame_payload(payload):
+    """Payload followed by its CRC; independent of seq and service."""
+    return payload + crc16_ccitt(payload).to_bytes(2, "little")
+
+
+def build_aa_framed(seq, svc_hi, svc_lo, framed):
+    """build_aa for a frame_payload() result: only the header is added."""
+    return _AA_HEADER.pack(0xAA, 0x21, seq & 0xFF, len(framed), 0x01, 0x01, svc_hi, svc_lo) + framed
+
+
+# Gap after each write-without-response. Those writes are not flow-controlled
+# on every backend, so back-to-back packets can be dropped; the bridge
+# (bridge/server.py) paces its writes the same way.
+WRITE_GAP = 0.05  # seconds
+
+# Timestamp-free auth packets are constant, so build them once
+_AUTH_1 = add_crc(bytes([0xAA,0x21,0x01,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x0C,0x1A,0x04,0x08,0x01,0x10,0x04]))
+_AUTH_2 = add_crc(bytes([0xAA,0x21,0x02,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x0E,0x22,0x02,0x08,0x02]))
+_AUTH_4 = add_crc(bytes([0xAA,0x21,0x04,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x10,0x1A,0x04,0x08,0x01,0x10,0x04]))
+_AUTH_5 = add_crc(bytes([0xAA,0x21,0x05,0x0C,0x01,0x01,0x80,0x00,0x08,0x04,0x10,0x11,0x1A,0x04,0x08,0x01,0x10,0x04]))
+_AUTH_6 = add_crc(bytes([0xAA,0x21,0x06,0x0A,0x01,0x01,0x80,0x20,0x08,0x05,0x10,0x12,0x22,0x02,0x08,0x01]))
+
+
+def build_auth_packets():
+    """Return the seven handshake packets (seq 1-7).
+
+    Callers write them in order, WRITE_GAP apart, and wait once afterwards
+    for the responses.
+    """
+    timestamp = int(time.time())
+    ts = encode_varint(timestamp)
+    txid = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
+    pl = b"".join((bytes([0x08,0x80,0x01,0x10,0x0F,0x82,0x08,0x11,0x08]), ts, b"\x10", txid))
+    p3 = add_crc(bytes([0xAA,0x21,0x03,len(pl)+2,0x01,0x01,0x80,0x20]) + pl)
+    pl = b"".join((bytes([0x08,0x80,0x01,0x10,0x13,0x82,0x08,0x11,0x08]), ts, b"\x10", txid))
+    p7 = add_crc(bytes([0xAA,0x21,0x07,len(pl)+2,0x01,0x01,0x80,0x20]) + pl)
+    return [_AUTH_1, _AUTH_2, p3, _AUTH_4, _AUTH_5, _AUTH_6, p7]
+
+
+# ============================================================================
+# Protobuf helpers for building widget payloads
+# ============================================================================
+
+_PB_TAG_VARINT = tuple(bytes([(field << 3) | 0]) for field in range(32))
+_PB_TAG_BYTES = tuple(bytes([(field << 3) | 2]) for field in range(32))
+
+
+def pb_varint(field, value):
+    """Encode a protobuf varint field."""
+    return _PB_TAG_VARINT[field] + encode_varint(value)
+
+def pb_bytes(field, data):
+    """Encode a protobuf length-delimited field."""
+    return b"".join((_PB_TAG_BYTES[field], encode_varint(len(data)), data))
+
+def pb_string(field, text):
+    """Encode a protobuf string field."""
+    return pb_bytes(field, text.encode('utf-8'))
+
+
+# ============================================================================
+# JSON cache and lens addresses
+# ============================================================================
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "even-g2")
+
+# {"left": address, "right": address}; each side is only ever written with a
+# lens that advertised as that side
+DEVICE_CACHE = os.path.join(CACHE_DIR, "device.json")
+DEVICE_TTL = 30 * 24 * 3600  # seconds
+
+
+def read_cache(path, ttl):
+    """Return the JSON stored at path if younger than ttl seconds, else None."""
+    try:
+        if time.time() - os.path.getmtime(path) >= ttl:
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache(path, data):
+    """Atomically replace path with data as JSON; errors are ignored."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def lens_side(device):
+    """Return "left" or "right" from a G2 advertised name, else None."""
+    name = device.name or ""
+    if "_L_" in name:
+        return "left"
+    if "_R_" in name:
+        return "right"
+    return None
+
+
+def load_cached_lenses():
+    """Return the cached lens addresses, or {} if missing or stale."""
+    cache = read_cache(DEVICE_CACHE, DEVICE_TTL)
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_cached_lenses(*devices):
+    """Record each device under its own side, keeping the other side's entry."""
+    cache = load_cached_lenses()
+    for device in devices:
+        side = lens_side(device) if device is not None else None
+        if side is not None:
+            cache[side] = device.address
+    write_cache(DEVICE_CACHE, cache)
+
+
+# ============================================================================
+# Discovery
+# ============================================================================
+
+async def find_g2(timeout=10.0, grace=2.0):
+    """Scan until a G2 left lens shows up; fall back to any G2 after `grace` s."""
+    loop = asyncio.get_running_loop()
+    found = loop.create_future()
+    first = None  # first non-left G2 seen, used if no left lens turns up
+    fallback = None
+
+    def on_detect(device, adv):
+        nonlocal first, fallback
+        if found.done() or not device.name or "G2" not in device.name:
+            return
+        if "_L_" in device.name:
+            found.set_result(device)
+        elif first is None:
+            first = device
+            fallback = loop.call_later(
+                grace, lambda: found.done() or found.set_result(device))
+
+    async with BleakScanner(detection_callback=on_detect):
+        try:
+            return await asyncio.wait_for(found, timeout)
+        except asyncio.TimeoutError:
+            return first
+        finally:
+            if fallback is not None:
+                fallback.cancel()
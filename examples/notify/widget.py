@@ -19,10 +19,11 @@ Usage:
 
 import argparse
 import asyncio
-import time
 from datetime import datetime
 from bleak import BleakClient, BleakScanner
 
+from g2proto import build_aa, build_auth_packets, pb_bytes, pb_string, pb_varint
+
 
 # =============================================================================
 # BLE Protocol (same as notify.py)
@@ -33,69 +34,6 @@ CHAR_WRITE = UUID_BASE.format(0x5401)
 CHAR_NOTIFY = UUID_BASE.format(0x5402)
 
 
-def crc16_ccitt(data, init=0xFFFF):
-    crc = init
-    for byte in data:
-        crc ^= byte << 8
-        for _ in range(8):
-            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
-            crc &= 0xFFFF
-    return crc
-
-
-def add_crc(packet):
-    crc = crc16_ccitt(packet[8:])
-    return packet + bytes([crc & 0xFF, (crc >> 8) & 0xFF])
-
-
-def encode_varint(value):
-    result = []
-    while value > 0x7F:
-        result.append((value & 0x7F) | 0x80)
-        value >>= 7
-    result.append(value & 0x7F)
-    return bytes(result)
-
-
-def build_aa_packet(seq, svc_hi, svc_lo, payload):
-    header = bytes([0xAA, 0x21, seq, len(payload) + 2, 0x01, 0x01, svc_hi, svc_lo])
-    return add_crc(header + payload)
-
-
-def pb_varint(field, value):
-    return bytes([(field << 3) | 0]) + encode_varint(value)
-
-
-def pb_bytes(field, data):
-    return bytes([(field << 3) | 2]) + encode_varint(len(data)) + data
-
-
-def pb_string(field, text):
-    return pb_bytes(field, text.encode('utf-8'))
-
-
-def build_auth_packets():
-    timestamp = int(time.time())
-    ts = encode_varint(timestamp)
-    txid = bytes([0xE8, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0xFF, 0x01])
-    p = []
-    p.append(add_crc(bytes([0xAA,0x21,0x01,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x0C,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x02,0x0A,0x01,0x01,0x80,0x20,
-        0x08,0x05,0x10,0x0E,0x22,0x02,0x08,0x02])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x0F,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x03,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    p.append(add_crc(bytes([0xAA,0x21,0x04,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x10,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x05,0x0C,0x01,0x01,0x80,0x00,
-        0x08,0x04,0x10,0x11,0x1A,0x04,0x08,0x01,0x10,0x04])))
-    p.append(add_crc(bytes([0xAA,0x21,0x06,0x0A,0x01,0x01,0x80,0x20,
-        0x08,0x05,0x10,0x12,0x22,0x02,0x08,0x01])))
-    pl = bytes([0x08,0x80,0x01,0x10,0x13,0x82,0x08,0x11,0x08]) + ts + bytes([0x10]) + txid
-    p.append(add_crc(bytes([0xAA,0x21,0x07,len(pl)+2,0x01,0x01,0x80,0x20]) + pl))
-    return p
-
-
 # =============================================================================
 # Conversate Protocol
 # =============================================================================
@@ -104,19 +42,19 @@ def build_session_start(seq, msg_id):
     inner = pb_varint(1, 1) + pb_varint(2, 1) + pb_varint(3, 1) + pb_varint(4, 1)
     session = pb_varint(1, 1) + pb_bytes(2, inner)
     payload = pb_varint(1, 1) + pb_varint(2, msg_id) + pb_bytes(3, session)
-    return build_aa_packet(seq, 0x0B, 0x20, payload)
+    return build_aa(seq, 0x0B, 0x20, payload)
 
 
 def build_transcription(seq, msg_id, text, is_final=True):
     transcript = pb_string(1, text) + pb_varint(2, 1 if is_final else 0)
     payload = pb_varint(1, 5) + pb_varint(2, msg_id) + pb_bytes(7, transcript)
-    return build_aa_packet(seq, 0x0B, 0x20, payload)
+    return build_aa(seq, 0x0B, 0x20, payload)
 
 
 def build_ai_response(seq, msg_id, text):
     """Type=2 AI response - also displays text."""
     payload = pb_varint(1, 2) + pb_varint(2, msg_id) + pb_string(3, text)
-    return build_aa_packet(seq, 0x0B, 0x20, payload)
+    return build_aa(seq, 0x0B, 0x20, payload)
 
 
 # =============================================================================